@@ -1,12 +1,24 @@
 import time
+
+# Measured before the other imports so the startup time includes them
+process_start = time.perf_counter()
+
+import os
+import sys
+import random
 import selenium
-import keyboard as kb
 from selenium import webdriver
 import selenium.common
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as ec
+from instrumentation import mark_level
+from cancellation import stop_signal
+from streaming_stats import StreamingStats, print_overhead
+import locators
+from board import Board
+from page_scripts import PAGE_HELPERS_JS, REPLAY_RETRY_MS, REPLAY_TIMEOUT_MS
 
 # Chrome driver options
 options = webdriver.ChromeOptions()
@@ -16,6 +28,60 @@ options.add_argument('--ignore-ssl-errors')
 options.add_argument("--log-level=3")
 options.add_experimental_option('excludeSwitches', ['enable-logging'])
 
+def lean_options() -> webdriver.ChromeOptions:
+    """
+    Builds options for a lean headless browser: no images, web fonts or extensions, a fixed small window
+    and the 'eager' page load strategy, which does not wait for images and stylesheets.
+    
+    Returns:
+        webdriver.ChromeOptions: The lean options.
+    """
+    lean = webdriver.ChromeOptions()
+    lean.add_argument('--headless=new')
+    lean.add_argument('--window-size=1280,800')
+    lean.add_argument('--disable-extensions')
+    lean.add_argument('--disable-remote-fonts')
+    lean.add_argument('--blink-settings=imagesEnabled=false')
+    lean.add_argument('--ignore-certificate-errors-spki-list')
+    lean.add_argument('--ignore-ssl-errors')
+    lean.add_argument("--log-level=3")
+    lean.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
+    lean.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    lean.page_load_strategy = 'eager'
+    return lean
+
+def should_stop(stop_key: str, level: int, max_levels: int = None) -> bool:
+    """
+    Checks whether a test which goes on indefinitely should stop. The stop key is listened for in the
+    background from the first check on, so a press between two checks is not missed.
+    
+    Args:
+        stop_key (str): The key to stop the test, or None to only stop at max_levels.
+        level (int): The level (or round) the test has reached.
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
+    
+    Returns:
+        bool: True if a stop was requested (stop key, Ctrl+C or time limit) or the level reached max_levels.
+    """
+    if max_levels and level and level >= max_levels:
+        return True
+    stop_signal.listen_for_key(stop_key)
+    return stop_signal.is_set()
+
+startup_reported = False
+
+def report_startup_time() -> None:
+    """
+    Prints the time from the process start to the first test interaction, once per process.
+    
+    Returns:
+        None
+    """
+    global startup_reported
+    if not startup_reported:
+        startup_reported = True
+        print(f"Time from process start to the first test interaction: {time.perf_counter() - process_start:.2f} s")
+
 # URLs of the tests on the Human Benchmark website
 test_urls = {
     "reaction time": "https://humanbenchmark.com/tests/reactiontime",
@@ -28,6 +94,74 @@ test_urls = {
     "visual memory": "https://humanbenchmark.com/tests/memory",
 }
 
+def override_test_urls(base_url: str, query: str = "") -> None:
+    """
+    Points every test URL at another host, e.g. the offline stand-in served by mock_site.py.
+    
+    Args:
+        base_url (str): The scheme and host to use instead of https://humanbenchmark.com.
+        query (str, optional): A query string appended to every URL. Defaults to no query.
+    
+    Returns:
+        None
+    """
+    for test_name, url in test_urls.items():
+        path = "/tests/" + url.split("/tests/", 1)[1].split("?", 1)[0]
+        test_urls[test_name] = base_url.rstrip("/") + path + (f"?{query}" if query else "")
+
+def count_round_trips(driver: webdriver.Chrome) -> None:
+    """
+    Counts every WebDriver command sent by the driver (and its elements) in driver.round_trips.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+    
+    Returns:
+        None
+    """
+    if hasattr(driver, "round_trips"):
+        return
+
+    execute = driver.execute
+    driver.round_trips = 0
+
+    def counted_execute(driver_command, params=None):
+        driver.round_trips += 1
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+
+def run_page_script(driver: webdriver.Chrome, script: str, *args):
+    """
+    Runs the body of an async JavaScript function in the page in a single WebDriver round trip.
+    The script gets its arguments as `args` and can use the helpers of PAGE_HELPERS_JS and the selectors
+    of the locator registry as `hbSelectors`.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        script (str): The body of the async function, its return value is sent back.
+        *args: Arguments passed to the script.
+    
+    Returns:
+        The value returned by the script.
+    
+    Raises:
+        selenium.common.exceptions.TimeoutException: If a wait inside the script timed out.
+        selenium.common.exceptions.JavascriptException: If the script failed.
+    """
+    wrapped = (
+        "const done = arguments[arguments.length - 1];\n" + locators.page_selectors_js() + PAGE_HELPERS_JS +
+        "(async (...args) => {\n" + script + "\n})(...Array.prototype.slice.call(arguments, 0, -1))"
+        ".then((value) => done({value: value}), (error) => done({error: String(error)}));"
+    )
+    result = driver.execute_async_script(wrapped, *args)
+
+    if "error" in result:
+        if "timed out" in result["error"]:
+            raise selenium.common.exceptions.TimeoutException(result["error"])
+        raise selenium.common.exceptions.JavascriptException(result["error"])
+    return result["value"]
+
 def consent(driver: webdriver.Chrome) -> None:
     """
     Clicks the consent button if it appears on the page.
@@ -40,7 +174,7 @@ def consent(driver: webdriver.Chrome) -> None:
     """
     try:
         consent_button = WebDriverWait(driver, 10).until(
-            ec.element_to_be_clickable((By.XPATH, "//button[@class='fc-button fc-cta-consent fc-primary-button']"))
+            ec.element_to_be_clickable(locators.consent_button)
         )
         consent_button.click()
     except Exception:
@@ -57,7 +191,7 @@ def press_start_continue_btn(driver: webdriver.Chrome) -> None:
         None
     """
     WebDriverWait(driver, 10).until(
-        ec.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'css-de05nr e19owgy710')]"))
+        ec.element_to_be_clickable(locators.start_button)
     ).click()
 
 def remove_ad(driver: webdriver.Chrome, timeout: int = 2) -> None:
@@ -72,12 +206,87 @@ def remove_ad(driver: webdriver.Chrome, timeout: int = 2) -> None:
         None
     """
     try:
-        WebDriverWait(driver, timeout).until(ec.presence_of_element_located(
-            (By.XPATH, "//div[starts-with(@style, 'grid-column: 4 / 4; place-self: center right; cursor: pointer;')]"))).click()
+        WebDriverWait(driver, timeout).until(ec.presence_of_element_located(locators.ad_close)).click()
         print("Removed blocking ad")
     except Exception:
         pass
 
+# URL patterns of the consent banner and the ads, blocked at the network level by block_ads
+blocked_urls = [
+    "*fundingchoicesmessages.google.com*",
+    "*googlesyndication.com*",
+    "*googletagservices.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*adservice.google.*",
+    "*amazon-adsystem.com*",
+    "*playwire.com*",
+    "*adnxs.com*",
+    "*pubmatic.com*",
+    "*rubiconproject.com*",
+    "*criteo.com*",
+]
+
+def block_ads(driver: webdriver.Chrome) -> bool:
+    """
+    Blocks the requests of the consent banner and the ads for the rest of the session.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+    
+    Returns:
+        bool: True if the requests are blocked, False if the browser does not support it.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        return True
+    except Exception:
+        print("Could not block ads")
+        return False
+
+# Tests whose page was checked by locators.check_page
+checked_pages = set()
+
+def open_test(driver: webdriver.Chrome, test_name: str) -> float:
+    """
+    Navigates to a test and returns as soon as its start element is clickable. When the consent banner
+    and the ads cannot be blocked, waits for them and clicks them away instead.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        test_name (str): The name of the test, as in test_urls.
+    
+    Returns:
+        float: The time to the first action of the test in seconds.
+    """
+    start = time.perf_counter()
+    blocked = getattr(driver, "ads_blocked", None)
+    if blocked is None:
+        blocked = driver.ads_blocked = block_ads(driver)
+
+    driver.get(test_urls[test_name])
+
+    if blocked:
+        WebDriverWait(driver, 20).until(ec.element_to_be_clickable(locators.start_locators[test_name]))
+
+        # Dismiss the banner or ad if they were served anyway, without waiting for them
+        for consent_button in driver.find_elements(*locators.consent_button):
+            consent_button.click()
+        remove_ad(driver, 0)
+    else:
+        consent(driver)
+        remove_ad(driver, 10)
+
+    time_to_first_action = time.perf_counter() - start
+    print(f"Time to first action in {test_name.title()}: {time_to_first_action:.2f} s")
+
+    # Validate the selectors once per test, after the first action is measured
+    if test_name not in checked_pages:
+        checked_pages.add(test_name)
+        locators.check_page(driver, [locators.start_locators[test_name]])
+    return time_to_first_action
+
 def get_current_level(driver: webdriver.Chrome) -> int:
     """
     Retrieves the current level number during a memory test.
@@ -90,58 +299,169 @@ def get_current_level(driver: webdriver.Chrome) -> int:
     """
     try:
         level_element = WebDriverWait(driver, 5).until(
-            ec.presence_of_element_located((By.XPATH, "//span[@class='css-dd6wi1']//span[2]"))
+            ec.presence_of_element_located(locators.level)
         )
         level_number = int(level_element.text)
+        mark_level(driver, level_number)
         print(f"Current level: {level_number}")
         return level_number
     except selenium.common.exceptions.TimeoutException:
         print("Failed to retrieve the current level.")
         return None
 
-def reaction_time(driver: webdriver.Chrome, tries: int = 1) -> None:
+# Starts one reaction time attempt, clicks as soon as the box turns green and waits for the result
+REACTION_ATTEMPT_JS = r"""
+const start = document.querySelector(hbSelectors.reaction_start + ', ' + hbSelectors.reaction_result);
+if (start) hbClick(start);
+const box = await hbWaitFor(() => document.querySelector(hbSelectors.reaction_go), 20000);
+const greenAt = performance.now();
+hbClick(box);
+const clickDelay = performance.now() - greenAt;
+const result = await hbWaitFor(
+    () => document.querySelector(hbSelectors.reaction_time), 20000);
+return {text: result.textContent, click_delay: clickDelay};
+"""
+
+# Notes when the box turns green and when the next click arrives, in the page's clock
+REACTION_CLOCK_JS = r"""
+if (window.hbReactionClock) return;
+const clock = {greenAt: null, clickDelay: null};
+new MutationObserver(() => {
+    const green = document.querySelector(hbSelectors.reaction_go);
+    if (green && clock.greenAt === null) {
+        clock.greenAt = performance.now();
+        clock.clickDelay = null;
+    }
+    if (!green) clock.greenAt = null;
+}).observe(document, {subtree: true, childList: true, attributes: true, attributeFilter: ['class']});
+document.addEventListener('mousedown', () => {
+    if (clock.greenAt !== null && clock.clickDelay === null) clock.clickDelay = performance.now() - clock.greenAt;
+}, true);
+window.hbReactionClock = clock;
+"""
+
+def reaction_time(driver: webdriver.Chrome, tries: int = 1) -> int:
     """
     Runs the Reaction Time test for a specified number of attempts and prints the best reaction time.
+    The bot's latency is measured in the page, from the box turning green to the click, so it includes
+    the polling delay before the bot notices the colour as well as the click round trip.
     
     Args:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
         tries (int, optional): Number of reaction time attempts. Defaults to 1.
     
     Returns:
-        None
+        int: The best reaction time in milliseconds.
     """
     reaction_div_start = WebDriverWait(driver, 20).until(
-        ec.presence_of_element_located((By.XPATH, "//div[contains(@class, 'view-splash')]"))
+        ec.presence_of_element_located(locators.reaction_start)
     )
+    driver.execute_script(locators.page_selectors_js() + REACTION_CLOCK_JS)
     reaction_div_start.click()
 
-    best_time = float('inf')
+    times = StreamingStats()
+    click_times = StreamingStats()
 
     for attempt in range(tries):
         reaction_div_stop = WebDriverWait(driver, 20, poll_frequency=0.1).until(
-            ec.presence_of_element_located((By.XPATH, "//div[contains(@class, 'view-go')]"))
+            ec.presence_of_element_located(locators.reaction_go)
         )
         reaction_div_stop.click()
 
         result_div = WebDriverWait(driver, 20).until(
-            ec.presence_of_element_located((By.XPATH, "//div[@class='css-1qvtbrk e19owgy78']/h1"))
+            ec.presence_of_element_located(locators.reaction_time)
         )
         reaction_time_result = result_div.text
         print(f"Reaction time for attempt {attempt + 1}: {reaction_time_result}")
 
-        reaction_time_float = float(reaction_time_result.strip('ms'))
-        if reaction_time_float < best_time:
-            best_time = reaction_time_float
+        times.add(float(reaction_time_result.strip('ms')))
+        click_delay = driver.execute_script("return window.hbReactionClock.clickDelay;")
+        if click_delay is not None:
+            click_times.add(click_delay)
 
         if attempt + 1 < tries:
             continue_button = WebDriverWait(driver, 20).until(
-                ec.presence_of_element_located((By.CLASS_NAME, "view-result"))
+                ec.presence_of_element_located(locators.reaction_result)
             )
             continue_button.click()
 
-    print(f"Best reaction time after {tries} tries: {int(best_time)} ms")
+    return print_reaction_summary(times, click_times)
+
+def print_reaction_summary(times: StreamingStats, click_times: StreamingStats) -> int:
+    """
+    Prints the best time and the distribution of the reaction times, and the bot's own click latency.
+    
+    Args:
+        times (StreamingStats): The reaction times reported by the site in milliseconds.
+        click_times (StreamingStats): The time from the box turning green to the bot's click in milliseconds.
+    
+    Returns:
+        int: The best reaction time in milliseconds.
+    """
+    print(f"Best reaction time after {times.count} tries: {int(times.minimum)} ms")
+    print(f"Mean: {times.mean:.0f} ms (sd {times.stdev:.0f} ms), p50: {times.percentile(50):.0f} ms, "
+          f"p90: {times.percentile(90):.0f} ms, p99: {times.percentile(99):.0f} ms")
+    print_overhead(times, click_times, "click")
+    return int(times.minimum)
 
-def aim(driver: webdriver.Chrome) -> None:
+def reaction_time_fast(driver: webdriver.Chrome, tries: int = 1) -> int:
+    """
+    Runs the Reaction Time test with a MutationObserver in the page that clicks on the same tick the
+    box turns green, so Python only waits once per attempt for the result.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        tries (int, optional): Number of reaction time attempts. Defaults to 1.
+    
+    Returns:
+        int: The best reaction time in milliseconds.
+    """
+    driver.set_script_timeout(30)
+    times = StreamingStats()
+    click_times = StreamingStats()
+
+    for attempt in range(tries):
+        attempt_result = run_page_script(driver, REACTION_ATTEMPT_JS)
+        times.add(float(attempt_result["text"].strip('ms')))
+        click_times.add(attempt_result["click_delay"])
+        print(f"Reaction time for attempt {attempt + 1}: {attempt_result['text']}")
+
+    return print_reaction_summary(times, click_times)
+
+def reaction_time_cdp(driver: webdriver.Chrome, tries: int = 1) -> int:
+    """
+    Runs the Reaction Time test on the asyncio DevTools backend, which awaits the page's notification
+    that the box turned green instead of polling for it.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance which opened the test.
+        tries (int, optional): Number of reaction time attempts. Defaults to 1.
+    
+    Returns:
+        int: The best reaction time in milliseconds.
+    """
+    import cdp_engine
+
+    return print_reaction_summary(*cdp_engine.run(driver, cdp_engine.reaction_time, tries))
+
+def reaction_time_vision(driver: webdriver.Chrome, tries: int = 1) -> int:
+    """
+    Runs the Reaction Time test on the vision backend, which watches the frames Chrome paints for the
+    box turning green instead of the DOM.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance which opened the test.
+        tries (int, optional): Number of reaction time attempts. Defaults to 1.
+    
+    Returns:
+        int: The best reaction time in milliseconds.
+    """
+    import cdp_engine
+    import vision
+
+    return print_reaction_summary(*cdp_engine.run(driver, vision.reaction_time, tries))
+
+def aim(driver: webdriver.Chrome) -> str:
     """
     Runs the Aim Trainer test by clicking 30 targets as quickly as possible.
     
@@ -149,20 +469,90 @@ def aim(driver: webdriver.Chrome) -> None:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
     
     Returns:
-        None
+        str: The average time per target shown by the site, e.g. "250ms".
     """
-    for _ in range(31):
+    target_times = StreamingStats()
+
+    for target_number in range(31):
+        target_start = time.perf_counter()
         target = WebDriverWait(driver, 2, poll_frequency=0.1).until(
-            ec.element_to_be_clickable((By.XPATH, "//div[starts-with(@class, 'css-17nnhwz') and starts-with(@style, 'width: 100px')]"))
+            ec.element_to_be_clickable(locators.aim_target)
         )
         target.click()
+        # The first target only starts the test
+        if target_number:
+            target_times.add((time.perf_counter() - target_start) * 1000)
 
     score = WebDriverWait(driver, 5).until(
-        ec.presence_of_element_located((By.XPATH, "//h1[contains(@class, 'css-0')]"))
+        ec.presence_of_element_located(locators.score)
     ).text
     print(f"Average time per target: {score}")
+    print_aim_summary(score, target_times)
+    return score
+
+def print_aim_summary(score: str, target_times: StreamingStats) -> None:
+    """
+    Prints the bot's time per target next to the average time reported by the site.
+    
+    Args:
+        score (str): The average time per target shown by the site, e.g. "250ms".
+        target_times (StreamingStats): The time the bot took to find and click every target in milliseconds.
+    
+    Returns:
+        None
+    """
+    site_times = StreamingStats()
+    try:
+        site_times.add(float(score.strip().strip('ms')))
+    except ValueError:
+        return
+    print_overhead(site_times, target_times, "find and click")
+
+# Clicks every target from inside the page until the score appears
+AIM_JS = r"""
+const remaining = /Remaining\s*(\d+)/.exec(document.body.innerText);
+const targets = remaining ? parseInt(remaining[1], 10) : 30;
+const clickedStyles = new WeakMap();
+const latencies = [];
+const isNew = (node) => clickedStyles.get(node) !== node.getAttribute('style');
+let last = performance.now();
+for (let clicks = 0; clicks <= targets; clicks++) {
+    const target = await hbWaitFor(() => Array.from(
+        document.querySelectorAll(hbSelectors.aim_target)).find(isNew), 5000);
+    clickedStyles.set(target, target.getAttribute('style'));
+    hbClick(target);
+    const now = performance.now();
+    latencies.push(now - last);
+    last = now;
+}
+const score = await hbWaitFor(() => document.querySelector(hbSelectors.score), 5000);
+return {score: score.textContent, targets: targets, latencies: latencies};
+"""
 
-def chimp(driver: webdriver.Chrome) -> None:
+def aim_fast(driver: webdriver.Chrome) -> str:
+    """
+    Runs the Aim Trainer test by locating and clicking every target from inside the page, returning to
+    Python only once the score appears. The amount of targets is read from the page.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+    
+    Returns:
+        str: The average time per target shown by the site, e.g. "250ms".
+    """
+    driver.set_script_timeout(120)
+    aim_result = run_page_script(driver, AIM_JS)
+
+    # The first latency is the start target, the others are the time between two clicks
+    target_times = StreamingStats()
+    for latency in aim_result["latencies"][1:]:
+        target_times.add(latency)
+    print(f"Clicked {aim_result['targets']} targets")
+    print(f"Average time per target: {aim_result['score']}")
+    print_aim_summary(aim_result["score"], target_times)
+    return aim_result["score"]
+
+def chimp(driver: webdriver.Chrome) -> int:
     """
     Runs the Chimp Test by clicking numbers in the correct order.
     
@@ -170,13 +560,14 @@ def chimp(driver: webdriver.Chrome) -> None:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
     
     Returns:
-        None
+        int: The amount of numbers on the last board that was solved.
     """
     press_start_continue_btn(driver)
+    numbers = 0
 
     while True:
         blocks = WebDriverWait(driver, 10).until(
-            ec.presence_of_all_elements_located((By.XPATH, "//div[@data-cellnumber]"))
+            ec.presence_of_all_elements_located(locators.chimp_cell)
         )
         
         blocks_with_numbers = [(block, int(block.get_attribute("data-cellnumber"))) for block in blocks]
@@ -184,13 +575,75 @@ def chimp(driver: webdriver.Chrome) -> None:
         
         for block, _ in blocks_with_numbers:
             block.click()
+        numbers = len(blocks_with_numbers)
 
         try:
             press_start_continue_btn(driver)
         except selenium.common.exceptions.TimeoutException:
             break
 
-def typing(driver: webdriver.Chrome, realism: bool) -> None:
+    return numbers
+
+# Clicks all numbers of the board in order and presses the continue button
+CHIMP_LEVEL_JS = r"""
+const cells = await hbWaitFor(() => {
+    const found = document.querySelectorAll(hbSelectors.chimp_cell);
+    return found.length ? found : null;
+}, 10000);
+const ordered = Array.from(cells, (node) => ({node: node, number: parseInt(node.getAttribute('data-cellnumber'), 10)}))
+    .sort((a, b) => a.number - b.number);
+ordered.forEach((cell) => hbClick(cell.node));
+const button = await hbWaitFor(
+    () => document.querySelector(hbSelectors.start_button), 10000).catch(() => null);
+if (button) hbClick(button);
+return {numbers: ordered.length, continued: button !== null};
+"""
+
+def chimp_fast(driver: webdriver.Chrome) -> int:
+    """
+    Runs the Chimp Test by reading and clicking every number of a board and pressing continue in a
+    single script call per level, so the cost per level does not grow with the board.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+    
+    Returns:
+        int: The amount of numbers on the last board that was solved.
+    """
+    press_start_continue_btn(driver)
+    driver.set_script_timeout(30)
+
+    numbers = 0
+    levels = 0
+    mark_level(driver, 1)
+    start = time.perf_counter()
+    round_trips_start = getattr(driver, "round_trips", 0)
+
+    while True:
+        level_start = time.perf_counter()
+        level_round_trips = getattr(driver, "round_trips", 0)
+        try:
+            level_result = run_page_script(driver, CHIMP_LEVEL_JS)
+        except selenium.common.exceptions.TimeoutException:
+            break
+
+        numbers = level_result["numbers"]
+        levels += 1
+        mark_level(driver, levels + 1)
+        round_trips = getattr(driver, "round_trips", level_round_trips + 1) - level_round_trips
+        print(f"Solved {numbers} numbers in {(time.perf_counter() - level_start) * 1000:.0f} ms "
+              f"with {round_trips} round trips")
+
+        if not level_result["continued"]:
+            break
+
+    elapsed = time.perf_counter() - start
+    total_round_trips = getattr(driver, "round_trips", round_trips_start + levels) - round_trips_start
+    if levels:
+        print(f"{levels / elapsed:.2f} levels per second, {total_round_trips / levels:.1f} round trips per level")
+    return numbers
+
+def typing(driver: webdriver.Chrome, realism: bool) -> str:
     """
     Runs the Typing test with either realistic or unrealistic typing speed.
     
@@ -199,14 +652,14 @@ def typing(driver: webdriver.Chrome, realism: bool) -> None:
         realism (bool): If True, simulate realistic typing speed; otherwise, type the text instantly.
     
     Returns:
-        None
+        str: The words per minute shown by the site, e.g. "120wpm".
     """
     typing_window = WebDriverWait(driver, 5).until(
-        ec.presence_of_element_located((By.XPATH, "//div[contains(@class, 'letters notranslate')]"))
+        ec.presence_of_element_located(locators.typing_window)
     )
 
     remaining_letters = WebDriverWait(driver, 5).until(
-        ec.presence_of_all_elements_located((By.XPATH, "//span[contains(@class, 'incomplete')]"))
+        ec.presence_of_all_elements_located(locators.typing_letter)
     )
 
     if realism:
@@ -221,88 +674,161 @@ def typing(driver: webdriver.Chrome, realism: bool) -> None:
         typing_window.send_keys(text_to_type)
 
     wmp = WebDriverWait(driver, 10).until(
-        ec.presence_of_element_located((By.XPATH, "//h1[contains(@class, 'css-0')]"))
+        ec.presence_of_element_located(locators.score)
+    ).text
+    print(f"Words typed per minute: {wmp}")
+    return wmp
+
+# Focuses the typing window and returns the whole passage left to type
+TYPING_TEXT_JS = r"""
+const typingWindow = document.querySelector(hbSelectors.typing_window);
+typingWindow.focus();
+return Array.from(typingWindow.querySelectorAll(hbSelectors.typing_letter), (span) => span.textContent || ' ')
+    .join('').replace(/\u00a0/g, ' ');
+"""
+
+def keystroke_schedule(text: str, wpm: float, jitter: float, seed: int = None) -> list:
+    """
+    Precomputes the delay before every keystroke of a text typed at a target speed.
+    
+    Args:
+        text (str): The text to type.
+        wpm (float): The target speed in words (5 characters) per minute.
+        jitter (float): Standard deviation of every delay, relative to the average delay.
+        seed (int, optional): Seed of the random jitter. Defaults to a random seed.
+    
+    Returns:
+        list: The delay in seconds before every character of the text.
+    """
+    rng = random.Random(seed)
+    average_delay = 60 / (wpm * 5)
+    return [max(0.0, rng.gauss(average_delay, average_delay * jitter)) for _ in text]
+
+def send_keystrokes(driver: webdriver.Chrome, text: str, delays: list = None, batch_seconds: float = 5) -> None:
+    """
+    Types text into the focused element with W3C actions, sending many keystrokes per round trip.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        text (str): The text to type.
+        delays (list, optional): The delay in seconds before every character. Defaults to no delay.
+        batch_seconds (float, optional): Amount of scheduled time sent in one round trip. Defaults to 5 seconds.
+    
+    Returns:
+        None
+    """
+    actions = ActionBuilder(driver)
+    scheduled = 0.0
+
+    for index, character in enumerate(text):
+        if delays:
+            actions.key_action.pause(delays[index])
+            scheduled += delays[index]
+        actions.key_action.key_down(character).key_up(character)
+
+        if scheduled >= batch_seconds:
+            actions.perform()
+            actions = ActionBuilder(driver)
+            scheduled = 0.0
+
+    actions.perform()
+
+def typing_fast(driver: webdriver.Chrome, realism: bool, wpm: float = 90, jitter: float = 0.3) -> str:
+    """
+    Runs the Typing test reading the passage in one script call. Unrealistic typing sends the whole
+    passage as one batch of keystrokes, realistic typing follows a precomputed keystroke schedule.
+    
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        realism (bool): If True, type at the target speed; otherwise, type the text instantly.
+        wpm (float, optional): The target speed of realistic typing in words per minute. Defaults to 90.
+        jitter (float, optional): Relative variation of the delay between keystrokes. Defaults to 0.3.
+    
+    Returns:
+        str: The words per minute shown by the site, e.g. "120wpm".
+    """
+    WebDriverWait(driver, 5).until(
+        ec.presence_of_element_located(locators.typing_letter)
+    )
+    text_to_type = driver.execute_script(locators.page_selectors_js() + TYPING_TEXT_JS)
+    print(f"Read {len(text_to_type)} characters")
+
+    delays = keystroke_schedule(text_to_type, wpm, jitter) if realism else None
+    send_keystrokes(driver, text_to_type, delays)
+
+    wmp = WebDriverWait(driver, 10).until(
+        ec.presence_of_element_located(locators.score)
     ).text
     print(f"Words typed per minute: {wmp}")
+    return wmp
 
-def sequence(driver: webdriver.Chrome, stop_key: str) -> None:
+def sequence(driver: webdriver.Chrome, stop_key: str, max_levels: int = None, input_delay: float = 0.2) -> int:
     """
-    Runs the sequence memory test until the stop_key is pressed.
+    Runs the sequence memory test until the stop_key is pressed or max_levels is reached.
 
     Args:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
         stop_key (str): The key to stop the test which goes on indefinitely
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
+        input_delay (float, optional): Seconds to wait after the last square went dark, the board ignores
+            clicks before that. Defaults to 0.2.
         
     Returns:
-        None
+        int: The last level that was reached.
     """
+    # Squares are captured by their index on the board and clicked through its cached handles
     # Start the sequence memory test by clicking the start button
     press_start_continue_btn(driver)
 
-    # Initialize an empty list to store the full sequence
-    sequence_list: list = []
-    squares_wrong: int = 0
+    level_number: int = 0
 
-    while not kb.is_pressed(stop_key):
+    while not should_stop(stop_key, level_number, max_levels):
         try:
-            # Capture the new squares in the sequence
-            new_squares: list = []
             level_number: int = get_current_level(driver)  # Get the current level
+            if level_number is None:
+                break
 
-            while True:
-                try:
-                    # Wait for an active square to appear
-                    active_square = WebDriverWait(driver, 10, poll_frequency=0.05).until(
-                        ec.presence_of_element_located((By.XPATH, "//div[contains(@class, 'square active')]"))
-                    )
+            # Index the grid once per level, its squares only change class
+            board = Board(driver, locators.sequence_square)
 
-                    # Add the WebElement only if it hasn't been captured before
-                    new_squares.append(active_square)
-
-                    # Break the loop if no new squares appear for 0.5 seconds (end of sequence for the level)
-                    try:
-                        WebDriverWait(driver, 0.5).until(
-                            ec.presence_of_element_located((By.XPATH, "//div[contains(@class, 'square active')]"))
-                        )
-                    except selenium.common.exceptions.TimeoutException:
-                        # No more squares, end of current level sequence
-                        print("New sequence captured.")
-                        break
-
-                except selenium.common.exceptions.TimeoutException:
-                    # If no active square appears, assume sequence capturing is over
-                    print("No more squares activated.")
-                    break
+            # The whole sequence is shown again every level, one square longer each time
+            sequence_list: list = []
+            while len(sequence_list) < level_number:
+                # Wait for a square to light up and store its index instead of the WebElement
+                active_square = WebDriverWait(driver, 10, poll_frequency=0.05).until(
+                    ec.presence_of_element_located(locators.sequence_active)
+                )
+                square_index = board.index_of(active_square)
+                if square_index is None:
+                    raise IndexError("The active square is not on the board")
+                sequence_list.append(square_index)
+
+                # Wait for it to go dark, so a square shown twice in a row is captured twice
+                WebDriverWait(driver, 5, poll_frequency=0.05).until_not(
+                    lambda _: board.has_class(square_index, "active")
+                )
 
-            # Ensure the sequence list contains the correct number of squares (matching the level number)
-            while len(sequence_list) < level_number and new_squares:
-                sequence_list.append(new_squares[-1])  # Add the last square in case of duplicates
+            print(f"New sequence captured: {sequence_list}")
+            time.sleep(input_delay)
 
-            # Click all squares in the correct sequence order
+            # Click all squares in the correct sequence order through the cached handles
             print("Clicking captured squares in order.")
-            for idx in range(len(sequence_list)):
+            level_element = driver.find_element(*locators.level)
+            for square_index in sequence_list:
+                board.click(square_index)
+
+            # The level shown changes, or the board is replaced by the result, once the sequence was accepted
+            def level_advanced(_) -> bool:
                 try:
-                    # Re-locate the current square before clicking to avoid stale references
-                    square = sequence_list[idx]
-                    # Confirm the square is still displayed and active
-                    if square.is_displayed():
-                        print(f"Clicking square {idx + 1}")
-                        square.click()
-                    else:
-                        print(f"Square {idx + 1} is not displayed, skipping.")
-
-                # If the bot captured a wrong square, the game will end. If a stale element is found three times, the game definitely ended
+                    return level_element.text != str(level_number)
                 except selenium.common.exceptions.StaleElementReferenceException:
-                    print(f"Stale element encountered for square {idx + 1}, skipping.")
-                    squares_wrong += 1
-
-                    if squares_wrong >= 3:
-                        print("Bot clicked wrong square. Game ended")
-                        break
-                    continue
+                    return True
 
-            # Wait for the next level to start (indicated by new square activation)
-            print("Waiting for the next level...")
+            try:
+                WebDriverWait(driver, 2, poll_frequency=0.05).until(level_advanced)
+            except selenium.common.exceptions.TimeoutException:
+                print("The board did not accept the sequence.")
+                break
 
         except IndexError:
             print("Failed to capture a square")
@@ -313,10 +839,138 @@ def sequence(driver: webdriver.Chrome, stop_key: str) -> None:
             break
 
     else:
-        print("Key pressed, stopping test...")
-        driver.quit()
+        print("Stopping test...")
+
+    return level_number
+
+# Records the grid index and time of every square that lights up
+SEQUENCE_RECORDER_JS = r"""
+if (window.hbSequence) return;
+const recorder = {log: [], replaying: false, grid: hbGrid(hbSelectors.sequence_square)};
+new MutationObserver((mutations) => {
+    if (recorder.replaying) return;
+    for (const mutation of mutations) {
+        const square = mutation.target;
+        if (!square.classList.contains('square') || !square.classList.contains('active')) continue;
+        if ((mutation.oldValue || '').split(' ').includes('active')) continue;
+        recorder.log.push({index: recorder.grid.indexOf(square), time: performance.now()});
+    }
+}).observe(document, {subtree: true, attributes: true, attributeFilter: ['class'], attributeOldValue: true});
+window.hbSequence = recorder;
+"""
+
+# Waits until the whole sequence of the current level has been shown and returns it
+SEQUENCE_WAIT_JS = r"""
+const level = () => hbLevel() || 1;
+const recorder = window.hbSequence;
+await hbWaitFor(() => recorder.log.length >= level() && !document.querySelector(hbSelectors.sequence_active),
+                5000 + 1000 * level());
+return {level: level(), squares: recorder.log.slice(0, level())};
+"""
+
+# Clicks the squares in order until the level advances or the board is gone, then forgets the flashes
+# caused by the clicks
+SEQUENCE_REPLAY_JS = r"""
+const [indices, retryMs, timeoutMs] = args;
+const recorder = window.hbSequence;
+recorder.replaying = true;
+const replay = await hbReplaySequence(() => indices.forEach((index) => hbClick(recorder.grid.cells[index])),
+                                      retryMs, timeoutMs);
+await new Promise((resolve) => setTimeout(resolve, 50));
+recorder.log = [];
+recorder.replaying = false;
+return replay;
+"""
+
+def sequence_fast(driver: webdriver.Chrome, stop_key: str, max_levels: int = None,
+                  retry_ms: int = REPLAY_RETRY_MS) -> int:
+    """
+    Runs the sequence memory test with a recorder in the page that logs the index of every square as
+    it lights up. Once the sequence has been shown it is read and replayed in one batch, again every
+    retry_ms until the level advances since the board only accepts clicks a moment after the last flash.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        stop_key (str): The key to stop the test which goes on indefinitely
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
+        retry_ms (int, optional): Milliseconds to wait for the level to advance before replaying again.
+            Defaults to REPLAY_RETRY_MS.
+        
+    Returns:
+        int: The last level that was reached.
+    """
+    driver.execute_script(locators.page_selectors_js() + PAGE_HELPERS_JS + SEQUENCE_RECORDER_JS)
+    press_start_continue_btn(driver)
+    driver.set_script_timeout(120)
+
+    level_number = 0
+    start = time.perf_counter()
+
+    while not should_stop(stop_key, level_number, max_levels):
+        try:
+            level_start = time.perf_counter()
+            shown = run_page_script(driver, SEQUENCE_WAIT_JS)
+        except selenium.common.exceptions.TimeoutException:
+            print("Sequence Memory test completed or failed.")
+            break
+
+        level_number = shown["level"]
+        mark_level(driver, level_number)
+        indices = [square["index"] for square in shown["squares"]]
+        replay = run_page_script(driver, SEQUENCE_REPLAY_JS, indices, retry_ms, REPLAY_TIMEOUT_MS)
+
+        # Most of a level is the site showing the sequence, which the bot cannot speed up
+        shown_time = shown["squares"][-1]["time"] - shown["squares"][0]["time"]
+        print(f"Level {level_number}: replayed {indices} {replay['replays']} time(s) after "
+              f"{(time.perf_counter() - level_start) * 1000:.0f} ms ({shown_time:.0f} ms of flashes)")
+        if not replay["advanced"]:
+            print("The board did not accept the sequence.")
+            break
+
+    else:
+        print("Stopping test...")
+
+    elapsed = time.perf_counter() - start
+    if level_number:
+        print(f"Reached level {level_number} at {level_number / elapsed:.2f} levels per second")
+    return level_number
+
+def sequence_cdp(driver: webdriver.Chrome, stop_key: str, max_levels: int = None) -> int:
+    """
+    Runs the sequence memory test on the asyncio DevTools backend, which collects the squares from
+    the page's notifications as they light up instead of polling for them.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance which opened the test.
+        stop_key (str): The key to stop the test which goes on indefinitely
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
+        
+    Returns:
+        int: The last level that was reached.
+    """
+    import cdp_engine
+
+    return cdp_engine.run(driver, cdp_engine.sequence, lambda level: should_stop(stop_key, level, max_levels))
+
+def sequence_vision(driver: webdriver.Chrome, stop_key: str, max_levels: int = None) -> int:
+    """
+    Runs the sequence memory test on the vision backend, which sees the squares light up in the frames
+    Chrome paints instead of in the DOM.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance which opened the test.
+        stop_key (str): The key to stop the test which goes on indefinitely
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
+        
+    Returns:
+        int: The last level that was reached.
+    """
+    import cdp_engine
+    import vision
+
+    return cdp_engine.run(driver, vision.sequence, lambda level: should_stop(stop_key, level, max_levels))
 
-def number(driver: webdriver.Chrome) -> None:
+def number(driver: webdriver.Chrome) -> int:
     """
     Runs the number memory test until the test is completed.
 
@@ -324,24 +978,26 @@ def number(driver: webdriver.Chrome) -> None:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
         
     Returns:
-        None
+        int: The amount of digits of the last number that was entered.
     """
     # Start the test by pressing the start/continue button
     press_start_continue_btn(driver)
+    digits = 0
 
     while True:
         try:
             number_elem = WebDriverWait(driver, 30).until(
                 ec.presence_of_element_located(
-                    (By.XPATH, "//div[contains(@class, 'big-number ')]")
+                    locators.number_shown
                 )
             )
             number = number_elem.text
             print(f"Captured number: {number}")
 
-            input_elem = WebDriverWait(driver, 10).until(ec.presence_of_element_located((By.XPATH, "//form//div[@class='css-1qvtbrk e19owgy78']/input[@type='text']")))
+            input_elem = WebDriverWait(driver, 10).until(ec.presence_of_element_located(locators.number_input))
 
             input_elem.send_keys(number)
+            digits = len(number)
 
             # Press the submit button
             press_start_continue_btn(driver)
@@ -351,27 +1007,87 @@ def number(driver: webdriver.Chrome) -> None:
         except selenium.common.exceptions.TimeoutException:
             break
 
-def verbal(driver: webdriver.Chrome, stop_key) -> None:
+    return digits
+
+# Reads the number as soon as it is shown, then fills it in, submits and continues
+NUMBER_LEVEL_JS = r"""
+const number = await hbWaitFor(() => {
+    const found = document.querySelector(hbSelectors.number_shown);
+    return found && found.textContent.trim() ? found : null;
+}, 10000);
+const digits = number.textContent.trim();
+const input = await hbWaitFor(
+    () => document.querySelector(hbSelectors.number_input),
+    10000 + 1000 * digits.length);
+
+// Set the whole number at once through the native setter, so the site's input handler sees it
+Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set.call(input, digits);
+input.dispatchEvent(new Event('input', {bubbles: true}));
+hbClick(input.form.querySelector(hbSelectors.start_button));
+
+const next = await hbWaitFor(() => {
+    const found = document.querySelector(hbSelectors.start_button);
+    return found && !found.closest('form') ? found : null;
+}, 5000).catch(() => null);
+if (next) hbClick(next);
+return {digits: digits, continued: next !== null};
+"""
+
+def number_fast(driver: webdriver.Chrome) -> int:
+    """
+    Runs the number memory test with one script call per level, which captures the number when it is
+    shown, waits for the input, fills in the whole number and presses submit and continue.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        
+    Returns:
+        int: The amount of digits of the last number that was entered.
+    """
+    press_start_continue_btn(driver)
+    driver.set_script_timeout(300)
+    digits = 0
+    mark_level(driver, 1)
+
+    while True:
+        try:
+            level_result = run_page_script(driver, NUMBER_LEVEL_JS)
+        except selenium.common.exceptions.TimeoutException:
+            break
+
+        digits = len(level_result["digits"])
+        mark_level(driver, digits + 1)
+        print(f"Captured number: {level_result['digits']}")
+
+        if not level_result["continued"]:
+            break
+
+    return digits
+
+def verbal(driver: webdriver.Chrome, stop_key, max_levels: int = None) -> str:
     """
-    Runs the verbal memory test until the stop_key is pressed.
+    Runs the verbal memory test until the stop_key is pressed or max_levels rounds are played.
 
     Args:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
         stop_key (_type_): The key to stop the test which goes on indefinitely
+        max_levels (int, optional): The number of rounds to stop at. Defaults to no limit.
         
-    Returns: None
+    Returns:
+        str: The last score shown by the site.
     """
     press_start_continue_btn(driver)  # Start the test
-    seen_words = []  # List to track the seen words
+    seen_words = set()  # Set to track the seen words
     lives = 3        # Start with 3 lives (as indicated in the UI)
     score = 0        # Start score
+    rounds = 0       # Words answered
 
-    while not kb.is_pressed(stop_key):
-        while lives > 0 and not kb.is_pressed(stop_key):
+    while not should_stop(stop_key, rounds, max_levels):
+        while lives > 0 and not should_stop(stop_key, rounds, max_levels):
             try:
                 # Capture the current word displayed
                 word_elem = WebDriverWait(driver, 10).until(
-                    ec.presence_of_element_located((By.XPATH, "//div[contains(@class, 'word')]"))
+                    ec.presence_of_element_located(locators.verbal_word)
                 )
                 word = word_elem.text
                 print(f"Captured word: {word}")
@@ -382,70 +1098,216 @@ def verbal(driver: webdriver.Chrome, stop_key) -> None:
 
                     # Click the "SEEN" button
                     seen_btn = WebDriverWait(driver, 10).until(
-                        ec.presence_of_element_located((By.XPATH, "//button[text()='SEEN']"))
+                        ec.presence_of_element_located(locators.verbal_seen)
                     )
                     seen_btn.click()
                 else:
                     print(f"{word} is a new word")
-                    # Add new word to seen words list
-                    seen_words.append(word)
+                    # Add new word to seen words set
+                    seen_words.add(word)
 
                     # Click the "NEW" button
                     new_btn = WebDriverWait(driver, 10).until(
-                        ec.presence_of_element_located((By.XPATH, "//button[text()='NEW']"))
+                        ec.presence_of_element_located(locators.verbal_new)
                     )
                     new_btn.click()
 
                 # Capture updated score and lives after the action
                 score = WebDriverWait(driver, 10).until(
-                    ec.presence_of_element_located((By.XPATH, "//span[contains(@class, 'score')]"))
+                    ec.presence_of_element_located(locators.verbal_score)
                 ).text
 
                 lives = WebDriverWait(driver, 10).until(
-                    ec.presence_of_element_located((By.XPATH, "//span[contains(@class, 'lives')]"))
+                    ec.presence_of_element_located(locators.verbal_lives)
                 ).text
 
                 print(f"Score: {score}, Lives: {lives}")
                 
                 lives = int(lives.lstrip("Lives | "))
+                rounds += 1
 
             except selenium.common.exceptions.TimeoutException:
                 print("Game stopped")
                 break
 
+        # The game is over once the lives run out or the page stops responding
+        break
+
     print(f"Final Score: {score}")
+    return score
+
+# Answers the word currently shown (args[0] is 'SEEN', 'NEW' or null) and reads the next word, score and lives
+VERBAL_ROUND_JS = r"""
+const text = (selector) => {
+    const node = document.querySelector(selector);
+    return node ? node.textContent : null;
+};
+const state = () => ({word: text(hbSelectors.verbal_word), score: text(hbSelectors.verbal_score),
+                      lives: text(hbSelectors.verbal_lives)});
+if (args[0]) {
+    const before = state();
+    hbClick(Array.from(document.querySelectorAll('button')).find((button) => button.textContent === args[0]));
+    await hbWaitFor(() => {
+        const after = state();
+        return after.word === null || after.score !== before.score || after.lives !== before.lives;
+    }, 10000);
+}
+return state();
+"""
 
-def visual(driver: webdriver.Chrome, stop_key) -> None:
+def verbal_fast(driver: webdriver.Chrome, stop_key, max_levels: int = None) -> str:
     """
-    Runs the visual memory test until the stop_key is pressed.
+    Runs the verbal memory test with one script call per round, which answers the current word and
+    reads the next word, score and lives. Seen words are kept in a set.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        stop_key (_type_): The key to stop the test which goes on indefinitely
+        max_levels (int, optional): The number of rounds to stop at. Defaults to no limit.
+        
+    Returns:
+        str: The last score shown by the site.
+    """
+    seen_words = set()
+
+    press_start_continue_btn(driver)
+    driver.set_script_timeout(30)
+
+    answer = None
+    rounds = 0
+    score = 0
+    start = time.perf_counter()
+
+    while not should_stop(stop_key, rounds, max_levels):
+        try:
+            state = run_page_script(driver, VERBAL_ROUND_JS, answer)
+        except selenium.common.exceptions.TimeoutException:
+            print("Game stopped")
+            break
+
+        if answer:
+            rounds += 1
+        if state["score"] is not None:
+            score = state["score"]
+        if state["word"] is None or int(state["lives"].lstrip("Lives | ")) <= 0:
+            break
+
+        word = state["word"]
+        if word in seen_words:
+            answer = "SEEN"
+        else:
+            seen_words.add(word)
+            answer = "NEW"
+
+        if rounds % 100 == 0:
+            print(f"Round {rounds}, Score: {score}, Lives: {state['lives']}")
+
+    else:
+        print("Stopping test...")
+
+    elapsed = time.perf_counter() - start
+    print(f"Final Score: {score}")
+    print(f"{rounds} rounds at {rounds / elapsed:.1f} rounds per second")
+    return score
+
+# Takes one snapshot of the cells shown in every reveal phase of the visual memory board
+VISUAL_RECORDER_JS = r"""
+if (window.hbVisual) return;
+const recorder = {revealed: [], ready: null, clicking: false, clickedActive: false, level: null,
+                  grid: hbGrid(hbSelectors.visual_cell)};
+// The cells only change class within a level, the board is indexed again when cells are added or removed
+new MutationObserver((mutations) => {
+    if (mutations.some((mutation) => mutation.type === 'childList')) recorder.grid.index();
+    const active = [];
+    recorder.grid.cells.forEach((cell, index) => {
+        if (cell.classList.contains('active')) active.push(index);
+    });
+    if (recorder.clicking) {
+        // Clicked cells light up until the board is reset for the next level or life
+        if (active.length > 0) recorder.clickedActive = true;
+        if ((recorder.clickedActive && active.length === 0) || hbLevel() !== recorder.level) recorder.clicking = false;
+        return;
+    }
+    if (active.length > 0) {
+        recorder.revealed = Array.from(new Set(recorder.revealed.concat(active)));
+    } else if (recorder.revealed.length > 0) {
+        recorder.ready = recorder.revealed;
+        recorder.revealed = [];
+    }
+}).observe(document, {subtree: true, childList: true, attributes: true, attributeFilter: ['class']});
+recorder.grid.index();
+window.hbVisual = recorder;
+"""
+
+# Waits for the end of the reveal phase and clicks the cells that were shown
+VISUAL_LEVEL_JS = r"""
+const recorder = window.hbVisual;
+const indices = await hbWaitFor(() => recorder.ready, 10000);
+recorder.ready = null;
+recorder.clicking = true;
+recorder.clickedActive = false;
+recorder.level = hbLevel();
+indices.forEach((index) => hbClick(recorder.grid.cells[index]));
+return {level: recorder.level, cells: indices};
+"""
+
+def visual(driver: webdriver.Chrome, stop_key, max_levels: int = None) -> int:
+    """
+    Runs the visual memory test until the stop_key is pressed or max_levels is reached. An observer in the
+    page snapshots the cells shown in each level and the bot clicks them in one batch once they are hidden again.
 
     Args:
         driver (webdriver.Chrome): The web driver instance for controlling the browser.
         stop_key (_type_): The key to stop the test which goes on indefinitely.
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
         
-    Returns: None
+    Returns:
+        int: The last level that was reached.
     """
+    driver.execute_script(locators.page_selectors_js() + PAGE_HELPERS_JS + VISUAL_RECORDER_JS)
     press_start_continue_btn(driver)
+    driver.set_script_timeout(30)
+
+    level_number = 0
+    start = time.perf_counter()
+    mark_level(driver, 1)
     
-    while not kb.is_pressed(stop_key):
+    while not should_stop(stop_key, level_number, max_levels):
         try:
-            try:
-                active_squares = WebDriverWait(driver, 1, poll_frequency=0.1).until(ec.presence_of_all_elements_located((By.XPATH, "//div[contains(@class, 'active css-lxtdud eut2yre1')]")))
-            except selenium.common.exceptions.TimeoutException:
-                for square in active_squares:
-                    square.click()
-                
-                get_current_level()
-            
+            level_result = run_page_script(driver, VISUAL_LEVEL_JS)
         except selenium.common.exceptions.TimeoutException:
             print("Game stopped")
             break
-        except selenium.common.exceptions.StaleElementReferenceException:
-            break
+
+        level_number = int(level_result["level"] or level_number)
+        mark_level(driver, level_number + 1)
+        print(f"Current level: {level_number}, clicked cells {level_result['cells']}")
         
     else:
-        print("Key pressed, stopping test...")
-        driver.quit()
+        print("Stopping test...")
+
+    elapsed = time.perf_counter() - start
+    if level_number:
+        print(f"Reached level {level_number} at {level_number / elapsed:.2f} levels per second")
+    return level_number
+
+def visual_vision(driver: webdriver.Chrome, stop_key, max_levels: int = None) -> int:
+    """
+    Runs the visual memory test on the vision backend, which sees the cells of each level in the frames
+    Chrome paints instead of in the DOM.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance which opened the test.
+        stop_key (_type_): The key to stop the test which goes on indefinitely.
+        max_levels (int, optional): The level to stop at. Defaults to no limit.
+        
+    Returns:
+        int: The last level that was reached.
+    """
+    import cdp_engine
+    import vision
+
+    return cdp_engine.run(driver, vision.visual, lambda level: should_stop(stop_key, level, max_levels))
     
 def all(driver: webdriver.Chrome, tries, stop_key) -> None:
     """
@@ -467,6 +1329,276 @@ def all(driver: webdriver.Chrome, tries, stop_key) -> None:
     verbal(driver)
     visual(driver)
 
+# Tests which go on indefinitely until they are stopped
+endless_tests = ['sequence memory', 'verbal memory', 'visual memory']
+
+# Tests whose result is the level reached
+level_tests = ['chimp test', 'sequence memory', 'number memory', 'visual memory']
+
+def make_test_functions(tries: int, stop_key: str, realism: bool, fast: bool, max_levels: int = None,
+                        backend: str = 'webdriver', wpm: float = 90, jitter: float = 0.3) -> dict:
+    """
+    Maps every test to a function running it with the given settings.
+
+    Args:
+        tries (int): Amount of reaction time tries.
+        stop_key (str): The key to stop the tests which go on indefinitely.
+        realism (bool): Whether to type realistically.
+        fast (bool): Whether to use the solvers running in the page.
+        max_levels (int, optional): Level at which the endless tests stop. Defaults to None.
+        backend (str, optional): 'webdriver', 'cdp' to run the tests which have a DevTools version
+            on the asyncio backend, or 'vision' to run those which have one on the screencast.
+            Defaults to 'webdriver'.
+        wpm (float, optional): Target speed of realistic typing with the fast engine. Defaults to 90.
+        jitter (float, optional): Relative variation of the delay between keystrokes with the fast engine.
+            Defaults to 0.3.
+
+    Returns:
+        dict: The function of every test, called with the driver.
+    """
+    if backend == 'vision':
+        return {
+            **make_test_functions(tries, stop_key, realism, fast, max_levels, wpm=wpm, jitter=jitter),
+            'reaction time': lambda driver: reaction_time_vision(driver, tries),
+            'sequence memory': lambda driver: sequence_vision(driver, stop_key, max_levels),
+            'visual memory': lambda driver: visual_vision(driver, stop_key, max_levels),
+        }
+
+    if backend == 'cdp':
+        return {
+            **make_test_functions(tries, stop_key, realism, fast, max_levels, wpm=wpm, jitter=jitter),
+            'reaction time': lambda driver: reaction_time_cdp(driver, tries),
+            'sequence memory': lambda driver: sequence_cdp(driver, stop_key, max_levels),
+        }
+
+    return {
+        'reaction time': lambda driver: (reaction_time_fast if fast else reaction_time)(driver, tries),
+        'aim trainer': lambda driver: (aim_fast if fast else aim)(driver),
+        'chimp test': lambda driver: (chimp_fast if fast else chimp)(driver),
+        'typing': lambda driver: typing_fast(driver, realism, wpm, jitter) if fast else typing(driver, realism),
+        'sequence memory': lambda driver: (sequence_fast if fast else sequence)(driver, stop_key, max_levels),
+        'number memory': lambda driver: (number_fast if fast else number)(driver),
+        'verbal memory': lambda driver: (verbal_fast if fast else verbal)(driver, stop_key, max_levels),
+        'visual memory': lambda driver: visual(driver, stop_key, max_levels),
+    }
+
+def warm_up(driver: webdriver.Chrome) -> None:
+    """
+    Prepares a new browser: counts its round trips, blocks ads and consents once.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+
+    Returns:
+        None
+    """
+    count_round_trips(driver)
+    driver.ads_blocked = block_ads(driver)
+    driver.get(next(iter(test_urls.values())))
+    if not driver.ads_blocked:
+        consent(driver)
+
+def page_opener(test_name: str):
+    """
+    Builds the function opening a test on a driver.
+
+    Args:
+        test_name (str): The name of the test.
+
+    Returns:
+        callable: Called with the driver to open the test and wait until it can start.
+    """
+    def open_page(driver: webdriver.Chrome) -> None:
+        open_test(driver, test_name)
+        report_startup_time()
+    return open_page
+
+def stoppable(test_function):
+    """
+    Makes a test end quietly when it is stopped, under a watchdog which quits its browser if it does not
+    notice the stop in time.
+
+    Args:
+        test_function (callable): The test function, called with the driver.
+
+    Returns:
+        callable: The test function returning None if it was stopped.
+    """
+    def run_test(driver: webdriver.Chrome):
+        if stop_signal.whole_run and stop_signal.is_set():
+            return None
+
+        with stop_signal.watchdog(driver):
+            try:
+                return test_function(driver)
+            except Exception:
+                if not stop_signal.is_set():
+                    raise
+                print(f"Test stopped ({stop_signal.reason}).")
+                return None
+    return run_test
+
+def run_tests(selected_tests: list, test_functions: dict, browser_options: webdriver.ChromeOptions, workers: int = 0,
+              results_path: str = None, engine: str = 'standard', backend: str = 'webdriver') -> list:
+    """
+    Runs the selected tests one after another in one browser, or concurrently in headless browsers,
+    and appends a record of every run to the results file. A test that fails is reported with its error
+    and the following ones still run. The stop key stops the current test, or the whole run when the tests
+    run concurrently.
+
+    Args:
+        selected_tests (list): The names of the tests to run, a name appears once per repetition.
+        test_functions (dict): The functions returned by make_test_functions.
+        browser_options (webdriver.ChromeOptions): The options the browsers are launched with.
+        workers (int, optional): Parallel headless browsers, 0 runs the tests in a single window. Defaults to 0.
+        results_path (str, optional): The JSON Lines file or SQLite database to append to. Defaults to None.
+        engine (str, optional): The engine stored in the records. Defaults to 'standard'.
+        backend (str, optional): The backend stored in the records. Defaults to 'webdriver'.
+
+    Returns:
+        list: One report per run with the test name, its result or error, setup time and duration.
+    """
+    stop_signal.stop_on_interrupt()
+
+    def store(report: dict) -> None:
+        if not results_path:
+            return
+        from results_store import append_result
+
+        append_result(results_path, {
+            "test": report["test"],
+            "engine": engine,
+            "backend": backend,
+            "score": report["result"],
+            "level": report["result"] if report["test"] in level_tests else None,
+            "duration": report.get("duration"),
+            "setup_time": report.get("setup_time"),
+            "round_trips": report.get("round_trips"),
+            "peak_memory": report.get("peak_memory"),
+            "error": report.get("error"),
+            "stopped": report.get("stopped"),
+            "stop_latency": report.get("stop_latency"),
+        })
+
+    # Run the tests concurrently in separate headless browsers
+    if workers:
+        from parallel_runner import run_parallel, print_parallel_report
+
+        jobs = [(test_name, page_opener(test_name), stoppable(test_functions[test_name]))
+                for test_name in selected_tests]
+
+        start = time.perf_counter()
+        reports = run_parallel(jobs, browser_options, workers, warm_up)
+        print_parallel_report(reports, time.perf_counter() - start)
+        for report in reports:
+            store(report)
+
+    # Run the tests one after another, reusing one browser which only consents once
+    else:
+        from driver_pool import DriverPool, run_in_pool
+
+        reports = []
+        with DriverPool(browser_options, warm_up=warm_up) as pool:
+            for test_name in selected_tests:
+                if stop_signal.whole_run and stop_signal.is_set():
+                    break
+                print(f"Running {test_name.title()}")
+
+                report = {"test": test_name, "result": None, "error": None, "setup_time": None, "peak_memory": None}
+                try:
+                    report.update(run_in_pool(pool, page_opener(test_name), stoppable(test_functions[test_name])))
+                    peak_memory = f"{report['peak_memory'] / 2**20:.0f} MB" if report["peak_memory"] else "unknown"
+                    print(f"Setup time: {report['setup_time']:.2f} s, peak browser memory: {peak_memory}")
+                except Exception as error:
+                    report["error"] = f"{type(error).__name__}: {error}"
+                    print(f"{test_name.title()} failed: {report['error']}")
+
+                stopped = stop_signal.reason if stop_signal.is_set() else None
+                if stopped:
+                    print(f"Stopped by the {stopped} after {stop_signal.latency * 1000:.0f} ms")
+                report.update({"stopped": stopped, "stop_latency": stop_signal.latency if stopped else None})
+                reports.append(report)
+                store(report)
+                stop_signal.clear()
+
+    return reports
+
+def run_cli(argv: list) -> None:
+    """
+    Runs the bot without prompts.
+
+    Args:
+        argv (list): The command line arguments, without the program name.
+
+    Returns:
+        None
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Runs the Human Benchmark bot without prompts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run tests and append their results.")
+    run_parser.add_argument("--tests", nargs="+", default=["all"],
+                            help="Tests to run, e.g. 'reaction time' 'chimp test', or all. Defaults to all.")
+    run_parser.add_argument("--tries", type=int, default=5, help="Reaction time tries. Defaults to 5.")
+    run_parser.add_argument("--stop-key", help="Key stopping the tests which go on indefinitely.")
+    run_parser.add_argument("--max-levels", type=int, help="Level at which the endless tests stop.")
+    run_parser.add_argument("--time-limit", type=float, help="Seconds after which the run stops.")
+    run_parser.add_argument("--realism", choices=["realistic", "unrealistic"], default="realistic",
+                            help="Realism of the typing. Defaults to realistic.")
+    run_parser.add_argument("--wpm", type=float, default=90,
+                            help="Target speed of realistic typing with the fast engine. Defaults to 90.")
+    run_parser.add_argument("--jitter", type=float, default=0.3,
+                            help="Relative variation of the delay between keystrokes with the fast engine. "
+                                 "Defaults to 0.3.")
+    run_parser.add_argument("--repetitions", type=int, default=1, help="Runs of every test. Defaults to 1.")
+    run_parser.add_argument("--engine", choices=["standard", "fast"], default="standard",
+                            help="Solve in WebDriver calls (standard) or in the page (fast). Defaults to standard.")
+    run_parser.add_argument("--backend", choices=["webdriver", "cdp", "vision"], default="webdriver",
+                            help="Drive reaction time and sequence memory over WebDriver or the DevTools websocket "
+                                 "(needs websockets), or detect reaction time, sequence and visual memory in the "
+                                 "screencast (needs websockets, numpy and Pillow). Defaults to webdriver.")
+    run_parser.add_argument("--profile", choices=["standard", "lean"], default="standard",
+                            help="Browser profile. Defaults to standard.")
+    run_parser.add_argument("--workers", type=int, default=0,
+                            help="Parallel headless browsers, 0 runs in a single window. Defaults to 0.")
+    run_parser.add_argument("--results", default="results.jsonl",
+                            help="JSON Lines file, or SQLite database (.db/.sqlite), to append to. Defaults to results.jsonl.")
+
+    summary_parser = commands.add_parser("summary", help="Print percentiles of the stored results.")
+    summary_parser.add_argument("--results", default="results.jsonl",
+                                help="JSON Lines file or SQLite database to read. Defaults to results.jsonl.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        from results_store import load_results, summarize, print_summary
+
+        if not os.path.isfile(args.results):
+            print(f"No results file at {args.results}, run some tests with --results {args.results} first.")
+            sys.exit(1)
+        print_summary(summarize(load_results(args.results)))
+        return
+
+    tests = [test.lower() for test in args.tests]
+    if 'all' in tests:
+        tests = list(test_urls)
+    invalid = [test for test in tests if test not in test_urls]
+    if invalid:
+        parser.error(f"unknown tests: {', '.join(invalid)}")
+    if any(test in endless_tests for test in tests) and not (args.stop_key or args.max_levels or args.time_limit):
+        parser.error("sequence, verbal and visual memory go on indefinitely, "
+                     "pass --stop-key, --max-levels or --time-limit")
+
+    test_functions = make_test_functions(args.tries, args.stop_key, args.realism == "realistic",
+                                         args.engine == "fast", args.max_levels, args.backend, args.wpm, args.jitter)
+    browser_options = lean_options() if args.profile == "lean" else options
+    selected_tests = [test for test in tests for _ in range(args.repetitions)]
+    if args.time_limit:
+        stop_signal.stop_after(args.time_limit)
+    run_tests(selected_tests, test_functions, browser_options, args.workers, args.results, args.engine, args.backend)
+
 def main():
     # Prompt user for test selection
     while True:
@@ -492,6 +1624,7 @@ Choice: ''').lower()
     
     tries = None
     stop_key = None
+    realism = True
     if test in ['all of them', 'reaction time']:
         tries = int(input("Amount of tries (multiple reccomended): "))
 
@@ -519,41 +1652,52 @@ Choice: ''').lower()
             else:
                 print("Invalid realism option, please choose realistic or unrealistic.")
                 continue
-    # Mapping test to its respective function
-    test_functions = {
-        'reaction time': lambda: reaction_time(driver, tries),
-        'aim trainer': lambda: aim(driver),
-        'chimp test': lambda: chimp(driver),
-        'typing': lambda: typing(driver, realism),
-        'sequence memory': lambda: sequence(driver, stop_key),
-        'number memory': lambda: number(driver),
-        'verbal memory': lambda: verbal(driver, stop_key),
-        'visual memory': lambda: visual(driver, stop_key),
-    }
 
-    # Run all tests if "all" was selected
-    if 'all' in test:
-        for test_name, test_function in test_functions.items():
-            print(f"Running {test_name.replace('_', ' ').title()}")
+    while True:
+        engine_input = input("Engine (standard or fast): ").lower().strip()
 
-            driver = webdriver.Chrome(options=options)
-            driver.get(test_urls[test_name])
+        if engine_input in ['standard', 'fast']:
+            fast = engine_input == 'fast'
+            break
+        print("Invalid engine, please choose standard or fast.")
 
-            consent(driver)
-            remove_ad(driver, 10)
-            test_function()
+    while True:
+        backend = input("Backend (webdriver, cdp or vision): ").lower().strip()
 
-    # Run a single selected test
-    else:
-        driver = webdriver.Chrome(options=options)
-        driver.get(test_urls[test])
+        if backend in ['webdriver', 'cdp', 'vision']:
+            break
+        print("Invalid backend, please choose webdriver, cdp or vision.")
 
-        consent(driver)
-        remove_ad(driver, 10)
-        test_functions[test]()
+    while True:
+        profile_input = input("Browser profile (standard or lean): ").lower().strip()
+
+        if profile_input in ['standard', 'lean']:
+            browser_options = lean_options() if profile_input == 'lean' else options
+            break
+        print("Invalid profile, please choose standard or lean.")
+
+    while True:
+        workers_input = input("Parallel headless browsers (0 to run in a single window): ").strip()
+
+        if workers_input.isdigit():
+            workers = int(workers_input)
+            break
+        print("Invalid amount, please enter a whole number.")
+
+    repetitions = 1
+    if workers and 'all' not in test:
+        repetitions = int(input("Repetitions of the test: "))
+
+    test_functions = make_test_functions(tries, stop_key, realism, fast, backend=backend)
+    selected_tests = list(test_functions) if 'all' in test else [test] * repetitions
+    run_tests(selected_tests, test_functions, browser_options, workers, 'results.jsonl', 'fast' if fast else 'standard',
+              backend)
 
 if __name__ == "__main__":
     try:
-        main()
+        if len(sys.argv) > 1:
+            run_cli(sys.argv[1:])
+        else:
+            main()
     except selenium.common.exceptions.NoSuchWindowException:
         pass
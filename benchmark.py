@@ -0,0 +1,443 @@
+"""
+End-to-end latency benchmark of the bot against the offline stand-in served by mock_site.py.
+
+Every test function of HumanBenchmark_Bot.py is run against a local page with a deterministic seed
+through an override of test_urls, and its wall time, achieved score and WebDriver round trips are reported.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --tests "aim trainer" "chimp test" --seed 7 --max-level 5
+"""
+import argparse
+import copy
+import random
+import time
+from urllib.parse import urlencode
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+import HumanBenchmark_Bot as bot
+import cdp_engine
+import locators
+import mock_site
+import vision
+from instrumentation import Instrumentation
+from parallel_runner import run_parallel, print_parallel_report
+from streaming_stats import StreamingStats
+
+def benchmark_functions(tries: int, realism: bool, stop_key: str, fast: bool = False, backend: str = "webdriver",
+                        wpm: float = 90, jitter: float = 0.3) -> dict:
+    """
+    Maps every test to a function running it on a driver.
+
+    Args:
+        tries (int): Number of reaction time attempts.
+        realism (bool): Whether the typing test types at a realistic speed.
+        stop_key (str): The key passed to the tests which go on indefinitely.
+        fast (bool, optional): Whether to use the fast engine of the tests that have one. Defaults to False.
+        backend (str, optional): "webdriver", "cdp" or "vision" for the tests that have such a version.
+            Defaults to "webdriver".
+        wpm (float, optional): Target speed of realistic typing with the fast engine. Defaults to 90.
+        jitter (float, optional): Relative variation of the delay between keystrokes. Defaults to 0.3.
+
+    Returns:
+        dict: The test names mapped to functions taking the driver.
+    """
+    return bot.make_test_functions(tries, stop_key, realism, fast, backend=backend, wpm=wpm, jitter=jitter)
+
+def run_benchmark(tests: list = None, seed: int = 1, speed: float = 1.0, max_level: int = 10, tries: int = 5,
+                  realism: bool = False, stop_key: str = "end", headless: bool = True, fast: bool = False,
+                  lean: bool = False, block: bool = True, instrumentation: Instrumentation = None,
+                  backend: str = "webdriver", wpm: float = 90, jitter: float = 0.3) -> list:
+    """
+    Runs the selected tests against the offline site and measures them.
+
+    Args:
+        tests (list, optional): Names of the tests to run, as in test_urls. Defaults to all of them.
+        seed (int, optional): Seed of the offline pages. Defaults to 1.
+        speed (float, optional): Speed factor of the offline pages' animations. Defaults to 1.
+        max_level (int, optional): Level after which the endless tests end. Defaults to 10.
+        tries (int, optional): Number of reaction time attempts. Defaults to 5.
+        realism (bool, optional): Whether the typing test types at a realistic speed. Defaults to False.
+        stop_key (str, optional): The key passed to the tests which go on indefinitely. Defaults to "end".
+        headless (bool, optional): Whether Chrome runs without a window. Defaults to True.
+        fast (bool, optional): Whether to use the fast engine of the tests that have one. Defaults to False.
+        lean (bool, optional): Whether to launch Chrome with the lean headless profile. Defaults to False.
+        block (bool, optional): Whether to block the consent banner and ads instead of clicking them away.
+            Defaults to True.
+        instrumentation (Instrumentation, optional): Records the commands of every test. Defaults to None.
+        backend (str, optional): "webdriver", "cdp" or "vision" for the tests that have such a version.
+            Defaults to "webdriver".
+        wpm (float, optional): Target speed of realistic typing with the fast engine. Defaults to 90.
+        jitter (float, optional): Relative variation of the delay between keystrokes. Defaults to 0.3.
+
+    Returns:
+        list: One dict per test with its wall time, score, page result and round trips.
+    """
+    functions = benchmark_functions(tries, realism, stop_key, fast, backend, wpm, jitter)
+    tests = tests or list(functions)
+
+    options = bot.lean_options() if lean else copy.deepcopy(bot.options)
+    if headless and not lean:
+        options.add_argument("--headless=new")
+
+    server, base_url = mock_site.start_server()
+    bot.override_test_urls(base_url, urlencode({"seed": seed, "speed": speed, "max_level": max_level}))
+
+    results = []
+    try:
+        for test_name in tests:
+            print(f"Benchmarking {test_name.title()}")
+            driver = webdriver.Chrome(options=options)
+            bot.count_round_trips(driver)
+            if instrumentation:
+                instrumentation.attach(driver)
+            result = {"test": test_name, "score": None, "page_result": None, "error": None}
+
+            try:
+                if not block:
+                    driver.ads_blocked = False
+                result["setup_time"] = bot.open_test(driver, test_name)
+
+                driver.round_trips = 0
+                start = time.perf_counter()
+                try:
+                    if instrumentation:
+                        with instrumentation.test_section(test_name):
+                            result["score"] = functions[test_name](driver)
+                    else:
+                        result["score"] = functions[test_name](driver)
+                except Exception as error:
+                    result["error"] = f"{type(error).__name__}: {error}"
+                result["wall_time"] = time.perf_counter() - start
+                result["round_trips"] = driver.round_trips
+
+                try:
+                    result["page_result"] = driver.execute_script("return window.benchmarkResult || null;")
+                except Exception:
+                    pass
+            finally:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+            results.append(result)
+    finally:
+        server.shutdown()
+
+    return results
+
+def run_parallel_benchmark(tests: list = None, workers: int = None, repetitions: int = 1, seed: int = 1,
+                           speed: float = 1.0, max_level: int = 10, tries: int = 5, realism: bool = False,
+                           stop_key: str = "end", fast: bool = False, lean: bool = False,
+                           backend: str = "webdriver", wpm: float = 90, jitter: float = 0.3) -> None:
+    """
+    Runs the selected tests concurrently in headless browsers against the offline site and prints
+    the consolidated report.
+
+    Args:
+        tests (list, optional): Names of the tests to run, as in test_urls. Defaults to all of them.
+        workers (int, optional): Number of browsers running at the same time. Defaults to the number of cores.
+        repetitions (int, optional): Number of runs of every test. Defaults to 1.
+        seed (int, optional): Seed of the offline pages. Defaults to 1.
+        speed (float, optional): Speed factor of the offline pages' animations. Defaults to 1.
+        max_level (int, optional): Level after which the endless tests end. Defaults to 10.
+        tries (int, optional): Number of reaction time attempts. Defaults to 5.
+        realism (bool, optional): Whether the typing test types at a realistic speed. Defaults to False.
+        stop_key (str, optional): The key passed to the tests which go on indefinitely. Defaults to "end".
+        fast (bool, optional): Whether to use the fast engine of the tests that have one. Defaults to False.
+        lean (bool, optional): Whether to launch Chrome with the lean headless profile. Defaults to False.
+        backend (str, optional): "webdriver", "cdp" or "vision" for the tests that have such a version.
+            Defaults to "webdriver".
+        wpm (float, optional): Target speed of realistic typing with the fast engine. Defaults to 90.
+        jitter (float, optional): Relative variation of the delay between keystrokes. Defaults to 0.3.
+
+    Returns:
+        None
+    """
+    functions = benchmark_functions(tries, realism, stop_key, fast, backend, wpm, jitter)
+    tests = tests or list(functions)
+
+    server, base_url = mock_site.start_server()
+    bot.override_test_urls(base_url, urlencode({"seed": seed, "speed": speed, "max_level": max_level}))
+    try:
+        jobs = [(test_name, lambda driver, test_name=test_name: bot.open_test(driver, test_name), functions[test_name])
+                for _ in range(repetitions) for test_name in tests]
+        start = time.perf_counter()
+        reports = run_parallel(jobs, bot.lean_options() if lean else bot.options, workers)
+        print_parallel_report(reports, time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+# The inline XPath every locator replaced, and the test whose page it is measured on
+legacy_xpaths = {
+    "start_button": ("sequence memory", "//button[contains(@class, 'css-de05nr e19owgy710')]"),
+    "level": ("sequence memory", "//span[@class='css-dd6wi1']//span[2]"),
+    "sequence_active": ("sequence memory", "//div[contains(@class, 'square active')]"),
+    "reaction_start": ("reaction time", "//div[contains(@class, 'view-splash')]"),
+    "reaction_go": ("reaction time", "//div[contains(@class, 'view-go')]"),
+    "reaction_time": ("reaction time", "//div[@class='css-1qvtbrk e19owgy78']/h1"),
+    "aim_target": ("aim trainer",
+                   "//div[starts-with(@class, 'css-17nnhwz') and starts-with(@style, 'width: 100px')]"),
+    "score": ("aim trainer", "//h1[contains(@class, 'css-0')]"),
+    "typing_window": ("typing", "//div[contains(@class, 'letters notranslate')]"),
+    "typing_letter": ("typing", "//span[contains(@class, 'incomplete')]"),
+    "number_shown": ("number memory", "//div[contains(@class, 'big-number ')]"),
+    "verbal_word": ("verbal memory", "//div[contains(@class, 'word')]"),
+    "verbal_score": ("verbal memory", "//span[contains(@class, 'score')]"),
+}
+
+# Times one lookup of a CSS selector and of an XPath inside the page, in microseconds
+LOOKUP_TIME_JS = r"""
+const [css, xpath, repeats] = arguments;
+const time = (lookup) => {
+    const start = performance.now();
+    for (let i = 0; i < repeats; i++) lookup();
+    return (performance.now() - start) * 1000 / repeats;
+};
+return {
+    css: time(() => document.querySelector(css)),
+    xpath: time(() => document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue),
+    matches: document.querySelectorAll(css).length,
+};
+"""
+
+def benchmark_lookups(seed: int = 1, repeats: int = 200, headless: bool = True) -> list:
+    """
+    Measures the lookup of every registered locator against the XPath it replaced, through WebDriver
+    and inside the page, on the offline site.
+
+    Args:
+        seed (int, optional): Seed of the offline pages. Defaults to 1.
+        repeats (int, optional): Lookups per locator and method. Defaults to 200.
+        headless (bool, optional): Whether Chrome runs without a window. Defaults to True.
+
+    Returns:
+        list: One dict per locator with the milliseconds per WebDriver lookup and the microseconds per
+            in-page lookup of both methods.
+    """
+    options = copy.deepcopy(bot.options)
+    if headless:
+        options.add_argument("--headless=new")
+
+    server, base_url = mock_site.start_server()
+    bot.override_test_urls(base_url, urlencode({"seed": seed}))
+    driver = webdriver.Chrome(options=options)
+
+    results = []
+    try:
+        for name, (test_name, xpath) in legacy_xpaths.items():
+            if driver.current_url != bot.test_urls[test_name]:
+                driver.get(bot.test_urls[test_name])
+            css = locators.registry[name].css
+
+            webdriver_times = {}
+            for method, value in [(By.CSS_SELECTOR, css), (By.XPATH, xpath)]:
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    driver.find_elements(method, value)
+                webdriver_times[method] = (time.perf_counter() - start) * 1000 / repeats
+
+            in_page = driver.execute_script(LOOKUP_TIME_JS, css, xpath, repeats * 10)
+            results.append({"locator": name, "matches": in_page["matches"],
+                            "webdriver_css": webdriver_times[By.CSS_SELECTOR], "webdriver_xpath": webdriver_times[By.XPATH],
+                            "page_css": in_page["css"], "page_xpath": in_page["xpath"]})
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    return results
+
+def print_lookup_report(results: list) -> None:
+    """
+    Prints the lookup benchmark as a table.
+
+    Args:
+        results (list): The results returned by benchmark_lookups.
+
+    Returns:
+        None
+    """
+    print(f"\n{'Locator':<17}{'Matches':>8}{'XPath (WD)':>12}{'CSS (WD)':>10}{'XPath (page)':>14}{'CSS (page)':>12}"
+          f"{'Speedup':>9}")
+    for result in results:
+        speedup = result["page_xpath"] / result["page_css"] if result["page_css"] else float("nan")
+        print(f"{result['locator']:<17}{result['matches']:>8}{result['webdriver_xpath']:>10.2f}ms"
+              f"{result['webdriver_css']:>8.2f}ms{result['page_xpath']:>12.2f}us{result['page_css']:>10.2f}us"
+              f"{speedup:>8.1f}x")
+
+def benchmark_frames(frames: int = 300, grid: int = 7, width: int = 640, scale: float = 0.5, seed: int = 1) -> dict:
+    """
+    Measures the CPU time the vision backend spends per frame on synthetic boards, and checks that it
+    finds exactly the lit cells.
+
+    Args:
+        frames (int, optional): Number of frames. Defaults to 300.
+        grid (int, optional): Cells per side of the board. Defaults to 7, the largest visual memory board.
+        width (int, optional): Width of the frames in pixels. Defaults to 640, the screencast's.
+        scale (float, optional): Frame pixels per CSS pixel. Defaults to 0.5.
+        seed (int, optional): Seed of the lit cells. Defaults to 1.
+
+    Returns:
+        dict: The StreamingStats of the milliseconds of CPU to decode and to analyse a frame, and the
+            number of frames whose lit cells were not found exactly.
+    """
+    vision.require_packages()
+    rng = random.Random(seed)
+    rects = vision.grid_rects(grid)
+    masks = vision.CellMasks(rects)
+    height = int(max(rect["top"] + rect["height"] for rect in rects) * scale) + 50
+
+    decode, analyse = StreamingStats(), StreamingStats()
+    errors = 0
+    for _ in range(frames):
+        lit = set(rng.sample(range(len(rects)), rng.randint(0, grid + 2)))
+        data = vision.encode_frame(vision.synthetic_frame(width, height, rects, lit, scale))
+
+        start = time.process_time()
+        pixels = vision.decode_frame(data)
+        decoded = time.process_time()
+        found = set(masks.lit(pixels, scale).tolist())
+        analysed = time.process_time()
+
+        decode.add((decoded - start) * 1000)
+        analyse.add((analysed - decoded) * 1000)
+        errors += found != lit
+
+    return {"frames": frames, "decode": decode, "analyse": analyse, "errors": errors}
+
+def benchmark_vision(seed: int = 1, tries: int = 10, headless: bool = True) -> list:
+    """
+    Runs the reaction time test on the offline site with the DOM watcher of the DevTools backend and
+    with the vision backend. The reaction times reported by the site are the latency from the box
+    turning green to the click, detection included.
+
+    Args:
+        seed (int, optional): Seed of the offline pages. Defaults to 1.
+        tries (int, optional): Reaction time attempts per backend. Defaults to 10.
+        headless (bool, optional): Whether Chrome runs without a window. Defaults to True.
+
+    Returns:
+        list: One dict per backend with the StreamingStats of the reaction times and of the bot's own
+            latency, and the milliseconds of CPU per attempt.
+    """
+    options = copy.deepcopy(bot.options)
+    if headless:
+        options.add_argument("--headless=new")
+
+    server, base_url = mock_site.start_server()
+    bot.override_test_urls(base_url, urlencode({"seed": seed}))
+    driver = webdriver.Chrome(options=options)
+
+    results = []
+    try:
+        for backend, test in [("dom", cdp_engine.reaction_time), ("vision", vision.reaction_time)]:
+            bot.open_test(driver, "reaction time")
+            start = time.process_time()
+            times, delays = cdp_engine.run(driver, test, tries)
+            results.append({"backend": backend, "times": times, "delays": delays,
+                            "cpu": (time.process_time() - start) * 1000 / tries})
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    return results
+
+def print_vision_report(frames: dict, results: list) -> None:
+    """
+    Prints the vision benchmarks as tables.
+
+    Args:
+        frames (dict): The result returned by benchmark_frames.
+        results (list): The results returned by benchmark_vision.
+
+    Returns:
+        None
+    """
+    print(f"\nSynthetic frames: {frames['frames']}, wrong detections: {frames['errors']}")
+    for name in ["decode", "analyse"]:
+        stats = frames[name]
+        print(f"{name.title():<10} CPU per frame: mean {stats.mean:.3f} ms, p50 {stats.percentile(50):.3f} ms, "
+              f"p99 {stats.percentile(99):.3f} ms")
+
+    print(f"\n{'Backend':<10}{'Reaction p50':>14}{'Reaction p90':>14}{'Bot latency':>13}{'CPU/attempt':>13}")
+    for result in results:
+        times, delays = result["times"], result["delays"]
+        print(f"{result['backend']:<10}{times.percentile(50):>12.0f}ms{times.percentile(90):>12.0f}ms"
+              f"{delays.mean if delays.count else float('nan'):>11.1f}ms{result['cpu']:>11.1f}ms")
+
+def print_report(results: list) -> None:
+    """
+    Prints the benchmark results as a table.
+
+    Args:
+        results (list): The results returned by run_benchmark.
+
+    Returns:
+        None
+    """
+    print(f"\n{'Test':<18}{'Setup':>10}{'Wall time':>12}{'Round trips':>14}{'Score':>12}{'Page score':>12}  Error")
+    for result in results:
+        page_score = (result["page_result"] or {}).get("score")
+        print(f"{result['test'].title():<18}{result.get('setup_time', 0):>9.2f}s{result.get('wall_time', 0):>11.2f}s"
+              f"{result.get('round_trips', 0):>14}"
+              f"{str(result['score']):>12}{str(page_score):>12}  {result['error'] or ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot against the offline Human Benchmark stand-in.")
+    parser.add_argument("--tests", nargs="+", choices=list(bot.test_urls), help="Tests to run (default: all)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--max-level", type=int, default=10)
+    parser.add_argument("--tries", type=int, default=5)
+    parser.add_argument("--realistic", action="store_true", help="Type at a realistic speed in the typing test")
+    parser.add_argument("--wpm", type=float, default=90, help="Target speed of realistic typing with the fast engine")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Relative variation of the delay between keystrokes")
+    parser.add_argument("--stop-key", default="end")
+    parser.add_argument("--show-browser", action="store_true", help="Run Chrome with a window")
+    parser.add_argument("--engine", choices=["standard", "fast"], default="standard")
+    parser.add_argument("--profile", choices=["standard", "lean"], default="standard")
+    parser.add_argument("--backend", choices=["webdriver", "cdp", "vision"], default="webdriver",
+                        help="Drive reaction time and sequence memory over the DevTools websocket with cdp, "
+                             "or detect reaction time, sequence and visual memory in the screencast with vision")
+    parser.add_argument("--no-block", action="store_true", help="Click the consent banner and ads away instead")
+    parser.add_argument("--trace", metavar="PATH", help="Write a Chrome trace of every WebDriver command to PATH")
+    parser.add_argument("--workers", type=int, default=0, help="Run the tests in this many parallel browsers")
+    parser.add_argument("--repetitions", type=int, default=1, help="Runs of every test in parallel mode")
+    parser.add_argument("--locators", action="store_true",
+                        help="Benchmark the CSS locators against the XPaths they replaced instead of the tests")
+    parser.add_argument("--vision", action="store_true",
+                        help="Benchmark the vision backend on synthetic frames and against the DOM on reaction time")
+    args = parser.parse_args()
+
+    if args.locators:
+        print_lookup_report(benchmark_lookups(args.seed, headless=not args.show_browser))
+        return
+
+    if args.vision:
+        print_vision_report(benchmark_frames(seed=args.seed),
+                            benchmark_vision(args.seed, args.tries, headless=not args.show_browser))
+        return
+
+    if args.workers:
+        run_parallel_benchmark(args.tests, args.workers, args.repetitions, args.seed, args.speed, args.max_level,
+                               args.tries, args.realistic, args.stop_key, args.engine == "fast",
+                               args.profile == "lean", args.backend, args.wpm, args.jitter)
+        return
+
+    instrumentation = Instrumentation() if args.trace else None
+    results = run_benchmark(args.tests, args.seed, args.speed, args.max_level, args.tries,
+                            args.realistic, args.stop_key, not args.show_browser, args.engine == "fast",
+                            args.profile == "lean", not args.no_block, instrumentation, args.backend,
+                            args.wpm, args.jitter)
+    print_report(results)
+
+    if instrumentation:
+        instrumentation.print_summary()
+        instrumentation.export_chrome_trace(args.trace)
+        print(f"Wrote the trace to {args.trace}")
+
+if __name__ == "__main__":
+    main()
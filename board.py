@@ -0,0 +1,83 @@
+"""
+Grid boards of the memory tests.
+
+The sequence and visual memory boards are fixed grids whose cells only change class, so a Board locates
+its cells once and maps every cell to its index. Squares that light up are identified by index and
+clicked through the cached handles, without locating them again, and the cells are only located anew
+when the board was rendered again, e.g. resized between the levels of visual memory.
+"""
+import selenium.common
+from selenium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+
+class Board:
+    """
+    The cells of a grid, indexed in document order.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        locator (tuple): The locator matching every cell of the grid, e.g. locators.sequence_square.
+    """
+    def __init__(self, driver: webdriver.Chrome, locator: tuple):
+        self.driver = driver
+        self.locator = locator
+        self.cells = []
+        self.indices = {}
+        self.index()
+
+    def __len__(self):
+        return len(self.cells)
+
+    def index(self) -> None:
+        """
+        Locates the cells in a single round trip and maps each one to its position.
+
+        Returns:
+            None
+        """
+        self.cells = self.driver.find_elements(*self.locator)
+        self.indices = {cell.id: position for position, cell in enumerate(self.cells)}
+
+    def index_of(self, element: WebElement) -> int:
+        """
+        Finds the index of a cell, indexing the board again if it was rendered again.
+
+        Args:
+            element (WebElement): A cell of the board, e.g. the one that lit up.
+
+        Returns:
+            int: Its index, or None if it is not a cell of the board.
+        """
+        if element.id not in self.indices:
+            self.index()
+        return self.indices.get(element.id)
+
+    def has_class(self, position: int, class_name: str) -> bool:
+        """
+        Checks the class of a cell through its cached handle.
+
+        Args:
+            position (int): The index of the cell.
+            class_name (str): The class, e.g. "active".
+
+        Returns:
+            bool: True if the cell has the class.
+        """
+        return class_name in (self.cells[position].get_attribute("class") or "").split()
+
+    def click(self, position: int) -> None:
+        """
+        Clicks a cell through its cached handle. A board rendered again since it was indexed is indexed
+        once more instead of failing on every cell.
+
+        Args:
+            position (int): The index of the cell.
+
+        Returns:
+            None
+        """
+        try:
+            self.cells[position].click()
+        except selenium.common.exceptions.StaleElementReferenceException:
+            self.index()
+            self.cells[position].click()
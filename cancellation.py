@@ -0,0 +1,224 @@
+"""
+Cancellation of running tests.
+
+A StopSignal is a shared threading.Event set by a background source: the stop key (read by a listener
+thread instead of being polled between WebDriver waits), Ctrl+C, or a time limit for headless runs.
+The tests check it in their loop conditions, every WebDriverWait observes it on each poll, and a watchdog
+quits the driver if a test has not noticed the stop within a grace period, so a stop is bounded by the
+poll interval or the grace period instead of the longest wait. The latency between the request and the
+test noticing it is measured.
+"""
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+class TestStopped(Exception):
+    """
+    Raised inside a wait when a stop was requested.
+    """
+
+class StopSignal:
+    """
+    A stop request shared by the listeners and the running test.
+
+    A stop is either for the current test (the stop key) or for the whole run (Ctrl+C, time limit),
+    only the first kind is cleared between tests. While key_stops_run is set, e.g. when tests run
+    concurrently and there is no single current test, the stop key stops the whole run as well.
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.reason = None
+        self.whole_run = False
+        self.requested_at = None
+        self.latency = None
+        self.listening_key = None
+        self.key_stops_run = False
+
+    def request(self, reason: str, whole_run: bool = False) -> None:
+        """
+        Requests a stop, later requests are ignored until it is cleared.
+
+        Args:
+            reason (str): Why the test stops, e.g. "stop key".
+            whole_run (bool, optional): Whether the following tests should not run either. Defaults to False.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.event.is_set():
+                self.whole_run = self.whole_run or whole_run
+                return
+            self.reason = reason
+            self.whole_run = whole_run
+            self.requested_at = time.perf_counter()
+            self.latency = None
+            self.event.set()
+
+    def is_set(self) -> bool:
+        """
+        Checks whether a stop was requested, and measures the stop latency the first time it was.
+
+        Returns:
+            bool: True if a stop was requested.
+        """
+        if not self.event.is_set():
+            return False
+        if self.latency is None:
+            self.latency = time.perf_counter() - self.requested_at
+        return True
+
+    def raise_if_set(self) -> None:
+        """
+        Raises TestStopped if a stop was requested.
+
+        Returns:
+            None
+        """
+        if self.is_set():
+            raise TestStopped(self.reason)
+
+    def clear(self) -> None:
+        """
+        Forgets a stop of the current test before the next one starts.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if not self.whole_run:
+                self.event.clear()
+                self.reason = None
+
+    def listen_for_key(self, stop_key: str) -> None:
+        """
+        Starts listening for the stop key in the background, once per key.
+
+        The keyboard package hooks the global input, which needs root on Linux. Without it, a line
+        holding the key (or an empty line) typed in the terminal requests the stop instead.
+
+        Args:
+            stop_key (str): The key to stop the tests which go on indefinitely.
+
+        Returns:
+            None
+        """
+        if not stop_key or self.listening_key == stop_key:
+            return
+        self.listening_key = stop_key
+
+        try:
+            import keyboard
+            keyboard.on_press_key(stop_key, lambda _: self.request("stop key", self.key_stops_run))
+            return
+        except (ImportError, OSError, ValueError) as error:
+            print(f"Cannot hook the keyboard ({error}), type {stop_key} and Enter in the terminal to stop.")
+
+        def read_terminal():
+            for line in sys.stdin:
+                if line.strip() in ["", stop_key]:
+                    self.request("stop key", self.key_stops_run)
+
+        threading.Thread(target=read_terminal, daemon=True).start()
+
+    def stop_on_interrupt(self) -> None:
+        """
+        Makes the first Ctrl+C stop the run cleanly, a second one interrupts it at once.
+        Only has an effect when called from the main thread.
+
+        Returns:
+            None
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def interrupted(signum, frame):
+            if self.event.is_set() and self.whole_run:
+                raise KeyboardInterrupt
+            print("\nStopping, press Ctrl+C again to abort at once.")
+            self.request("interrupt", whole_run=True)
+
+        signal.signal(signal.SIGINT, interrupted)
+
+    def stop_after(self, seconds: float) -> None:
+        """
+        Stops the run after a time limit.
+
+        Args:
+            seconds (float): The time limit.
+
+        Returns:
+            None
+        """
+        timer = threading.Timer(seconds, self.request, ("time limit",), {"whole_run": True})
+        timer.daemon = True
+        timer.start()
+
+    @contextmanager
+    def watchdog(self, driver: webdriver.Chrome, grace: float = 2.0):
+        """
+        Quits the driver if the test inside the with block has not noticed a stop within the grace
+        period, e.g. because it waits in a page script. This aborts its in-flight command.
+
+        Args:
+            driver (webdriver.Chrome): The web driver instance the test runs on.
+            grace (float, optional): Seconds the test gets to notice a stop. Defaults to 2.
+        """
+        finished = threading.Event()
+
+        def watch():
+            while not finished.is_set():
+                if self.event.wait(0.1) and not finished.wait(grace):
+                    if self.latency is None:
+                        self.latency = time.perf_counter() - self.requested_at
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                    return
+
+        thread = threading.Thread(target=watch, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            finished.set()
+            thread.join()
+
+def observe_waits(stop: StopSignal) -> None:
+    """
+    Makes every WebDriverWait raise TestStopped on its next poll once a stop is requested, done once
+    per process.
+
+    Args:
+        stop (StopSignal): The signal the waits observe.
+
+    Returns:
+        None
+    """
+    if getattr(WebDriverWait.until, "observes_stop", False):
+        return
+
+    for method_name in ["until", "until_not"]:
+        def observed(self, method, message="", original=getattr(WebDriverWait, method_name)):
+            def condition(driver):
+                stop.raise_if_set()
+                return method(driver)
+
+            condition.__qualname__ = getattr(method, "__qualname__", "")
+            return original(self, condition, message)
+
+        # Waits already instrumented stay instrumented
+        observed.observes_stop = True
+        observed.instrumented = getattr(getattr(WebDriverWait, method_name), "instrumented", False)
+        setattr(WebDriverWait, method_name, observed)
+
+# The signal shared by the bot, its listeners and its waits
+stop_signal = StopSignal()
+observe_waits(stop_signal)
@@ -0,0 +1,484 @@
+"""
+An asyncio backend talking to Chrome over its DevTools websocket instead of the WebDriver HTTP bridge.
+
+Selenium still launches the browser and opens the test, then a CDPSession connects to the page's
+DevTools target. Scripts installed in the page watch the DOM with a MutationObserver and push what they
+see through a Runtime binding (window.hbNotify), so a test awaits page events as they happen instead of
+polling for elements, and answers with trusted Input events sent over the same websocket. A sequence
+memory replay is the exception: it is clicked in the page in one command, so it cannot be cut in half.
+
+Requires the optional websockets package (pip install websockets).
+"""
+import asyncio
+import itertools
+import json
+import time
+import urllib.request
+
+from selenium import webdriver
+
+import locators
+from page_scripts import PAGE_HELPERS_JS, REPLAY_RETRY_MS, REPLAY_TIMEOUT_MS
+from streaming_stats import StreamingStats
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+# Name of the binding the page scripts report their events through
+BINDING = "hbNotify"
+
+class CDPError(Exception):
+    """
+    Raised when Chrome answers a command with an error or a script throws.
+    """
+
+class CDPSession:
+    """
+    A connection to one DevTools target.
+
+    Args:
+        websocket_url (str): The webSocketDebuggerUrl of the target.
+    """
+    def __init__(self, websocket_url: str):
+        self.websocket_url = websocket_url
+        self.websocket = None
+        self.listener = None
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.subscribers = {}
+        self.notifications = asyncio.Queue()
+        self.messages = 0
+
+    async def connect(self) -> None:
+        """
+        Opens the websocket, starts dispatching its messages and exposes the binding to the page.
+
+        Returns:
+            None
+        """
+        if websockets is None:
+            raise ImportError("The CDP backend requires the websockets package: pip install websockets")
+
+        self.websocket = await websockets.connect(self.websocket_url, max_size=None)
+        self.listener = asyncio.create_task(self.listen())
+        await self.send("Runtime.enable")
+        await self.send("Runtime.addBinding", {"name": BINDING})
+
+    async def close(self) -> None:
+        """
+        Stops listening and closes the websocket.
+
+        Returns:
+            None
+        """
+        if self.listener:
+            self.listener.cancel()
+        if self.websocket:
+            await self.websocket.close()
+
+    async def listen(self) -> None:
+        """
+        Resolves the pending commands and hands every event to its subscribers until the websocket closes.
+
+        Returns:
+            None
+        """
+        try:
+            async for raw_message in self.websocket:
+                message = json.loads(raw_message)
+
+                if "id" in message:
+                    future = self.pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+
+                params = message.get("params", {})
+                if message["method"] == "Runtime.bindingCalled" and params.get("name") == BINDING:
+                    self.notifications.put_nowait(json.loads(params["payload"]))
+                for queue in self.subscribers.get(message["method"], []):
+                    queue.put_nowait(params)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("The DevTools websocket was closed"))
+            self.notifications.put_nowait({"type": "closed"})
+
+    async def send(self, method: str, params: dict = None) -> dict:
+        """
+        Sends a command and waits for its answer.
+
+        Args:
+            method (str): The CDP method, e.g. "Runtime.evaluate".
+            params (dict, optional): Its parameters. Defaults to None.
+
+        Returns:
+            dict: The result of the command.
+
+        Raises:
+            CDPError: If Chrome answered with an error.
+        """
+        message_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        self.messages += 1
+        await self.websocket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        return await future
+
+    def subscribe(self, method: str) -> asyncio.Queue:
+        """
+        Collects the parameters of every event of a method.
+
+        Args:
+            method (str): The CDP event, e.g. "Page.loadEventFired".
+
+        Returns:
+            asyncio.Queue: The queue the events are put in.
+        """
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(method, []).append(queue)
+        return queue
+
+    async def notification(self, kind: str, timeout: float) -> dict:
+        """
+        Waits for the next notification of a kind sent by a page script, skipping the others.
+
+        Args:
+            kind (str): The "type" of the notification.
+            timeout (float): Seconds to wait.
+
+        Returns:
+            dict: The notification.
+
+        Raises:
+            asyncio.TimeoutError: If no such notification arrived in time.
+            ConnectionError: If the websocket was closed, e.g. because the browser was quit.
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            event = await asyncio.wait_for(self.notifications.get(), max(0, deadline - time.perf_counter()))
+            if event["type"] == "closed":
+                raise ConnectionError("The DevTools websocket was closed")
+            if event["type"] == kind:
+                return event
+
+    def discard_notifications(self) -> None:
+        """
+        Forgets the notifications that were not awaited yet.
+
+        Returns:
+            None
+        """
+        while not self.notifications.empty():
+            self.notifications.get_nowait()
+
+    async def evaluate(self, expression: str, await_promise: bool = False):
+        """
+        Evaluates JavaScript in the page.
+
+        Args:
+            expression (str): The expression.
+            await_promise (bool, optional): Whether to wait for the promise it returns. Defaults to False.
+
+        Returns:
+            The value of the expression.
+
+        Raises:
+            CDPError: If the expression threw.
+        """
+        result = await self.send("Runtime.evaluate", {"expression": expression, "awaitPromise": await_promise,
+                                                      "returnByValue": True})
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text"))
+        return result["result"].get("value")
+
+    async def click(self, x: float, y: float) -> None:
+        """
+        Clicks a point of the viewport with trusted mouse events.
+
+        Args:
+            x (float): The horizontal position in CSS pixels.
+            y (float): The vertical position in CSS pixels.
+
+        Returns:
+            None
+        """
+        for event_type in ["mousePressed", "mouseReleased"]:
+            await self.send("Input.dispatchMouseEvent", {"type": event_type, "x": x, "y": y, "button": "left",
+                                                         "clickCount": 1})
+
+    async def click_selector(self, selector: str, timeout: float = 10) -> None:
+        """
+        Waits until an element matching a CSS selector is in the page and clicks its centre.
+
+        Args:
+            selector (str): The CSS selector.
+            timeout (float, optional): Seconds to wait for the element. Defaults to 10.
+
+        Returns:
+            None
+
+        Raises:
+            CDPError: If no element appeared in time.
+        """
+        wait_ms = int(timeout * 1000)
+        point = await self.evaluate(WAIT_FOR_CENTER_JS % (json.dumps(selector), wait_ms, wait_ms), await_promise=True)
+        await self.click(point["x"], point["y"])
+
+# Resolves with the centre of the first element matching the selector once it is in the page
+WAIT_FOR_CENTER_JS = r"""
+new Promise((resolve, reject) => {
+    const find = () => {
+        const node = document.querySelector(%s);
+        if (!node) return false;
+        const rect = node.getBoundingClientRect();
+        resolve({x: rect.left + rect.width / 2, y: rect.top + rect.height / 2});
+        return true;
+    };
+    if (find()) return;
+    const observer = new MutationObserver(() => {
+        if (!find()) return;
+        observer.disconnect();
+        clearTimeout(timer);
+    });
+    observer.observe(document, {subtree: true, childList: true, attributes: true});
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        reject(new Error('timed out after %d ms'));
+    }, %d);
+})
+"""
+
+def page_websocket_url(driver: webdriver.Chrome) -> str:
+    """
+    Looks up the DevTools websocket of the driver's current tab.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+
+    Returns:
+        str: The webSocketDebuggerUrl of the tab.
+    """
+    address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+    with urllib.request.urlopen(f"http://{address}/json") as response:
+        targets = [target for target in json.load(response) if target["type"] == "page"]
+
+    # chromedriver uses the DevTools target id as window handle
+    for target in targets:
+        if target["id"] == driver.current_window_handle:
+            return target["webSocketDebuggerUrl"]
+    return targets[0]["webSocketDebuggerUrl"]
+
+def run(driver: webdriver.Chrome, test, *args):
+    """
+    Runs a test of this module on the tab the driver has opened.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance which opened the test.
+        test (coroutine function): The test, called with the session and args.
+        *args: Arguments passed to the test.
+
+    Returns:
+        The value returned by the test.
+    """
+    async def run_session():
+        session = CDPSession(page_websocket_url(driver))
+        await session.connect()
+        try:
+            return await test(session, *args)
+        finally:
+            await session.close()
+            # Count the CDP commands like WebDriver round trips so both backends can be compared
+            if hasattr(driver, "round_trips"):
+                driver.round_trips += session.messages
+
+    return asyncio.run(run_session())
+
+def with_selectors(watcher: str) -> str:
+    """
+    Calls a watcher script with the selectors of the locator registry and the helpers of PAGE_HELPERS_JS.
+
+    Args:
+        watcher (str): The script, a function taking the selectors as hbSelectors.
+
+    Returns:
+        str: The expression to evaluate.
+    """
+    return (f"((hbSelectors) => {{\n{PAGE_HELPERS_JS}\nreturn ({watcher.strip()})(hbSelectors);\n}})"
+            f"({locators.selectors_json()})")
+
+# Reports when the box turns green, when it is clicked and the result of every attempt
+REACTION_WATCHER_JS = r"""
+((hbSelectors) => {
+    if (window.hbReactionWatcher) return;
+    window.hbReactionWatcher = true;
+    const notify = (event) => window.hbNotify(JSON.stringify(event));
+    let greenAt = null;
+    let clickDelay = null;
+    let lastResult = null;
+    document.addEventListener('mousedown', () => {
+        if (greenAt !== null) clickDelay = performance.now() - greenAt;
+    }, true);
+    const check = () => {
+        const box = document.querySelector(hbSelectors.reaction_go);
+        if (box && greenAt === null) {
+            greenAt = performance.now();
+            const rect = box.getBoundingClientRect();
+            notify({type: 'go', x: rect.left + rect.width / 2, y: rect.top + rect.height / 2});
+        }
+        if (!box) greenAt = null;
+        const result = document.querySelector(hbSelectors.reaction_time);
+        const text = result ? result.textContent : null;
+        if (text && text !== lastResult) notify({type: 'result', text: text, click_delay: clickDelay});
+        lastResult = text;
+    };
+    new MutationObserver(check).observe(document, {subtree: true, childList: true, attributes: true,
+                                                   characterData: true});
+    check();
+})
+"""
+
+async def reaction_time(session: CDPSession, tries: int = 1, timeout: float = 20) -> tuple:
+    """
+    Runs the Reaction Time test, awaiting the page's notification that the box turned green and
+    clicking it with a trusted mouse event.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        tries (int, optional): Number of reaction time attempts. Defaults to 1.
+        timeout (float, optional): Seconds to wait for the box and the result. Defaults to 20.
+
+    Returns:
+        tuple: The StreamingStats of the reaction times and of the delays between the box turning green
+            and the click, in milliseconds.
+    """
+    await session.evaluate(with_selectors(REACTION_WATCHER_JS))
+    times = StreamingStats()
+    delays = StreamingStats()
+
+    for attempt in range(tries):
+        session.discard_notifications()
+        await session.click_selector(f"{locators.reaction_start.selector}, {locators.reaction_result.selector}", timeout)
+
+        go = await session.notification("go", timeout)
+        await session.click(go["x"], go["y"])
+
+        result = await session.notification("result", timeout)
+        times.add(float(result["text"].strip('ms')))
+        if result["click_delay"] is not None:
+            delays.add(result["click_delay"])
+        print(f"Reaction time for attempt {attempt + 1}: {result['text']}")
+
+    return times, delays
+
+# Reports every square that lights up or goes dark, with its grid index, centre and the current level
+SEQUENCE_WATCHER_JS = r"""
+((hbSelectors) => {
+    if (window.hbSequenceWatcher) return;
+    window.hbSequenceWatcher = true;
+    const level = () => hbLevel() || 1;
+    const grid = hbGrid(hbSelectors.sequence_square);
+    new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            const square = mutation.target;
+            if (!square.classList.contains('square')) continue;
+            const wasActive = (mutation.oldValue || '').split(' ').includes('active');
+            const isActive = square.classList.contains('active');
+            if (wasActive === isActive) continue;
+            const rect = square.getBoundingClientRect();
+            window.hbNotify(JSON.stringify({type: isActive ? 'flash' : 'dim', index: grid.indexOf(square),
+                                            level: level(), x: rect.left + rect.width / 2,
+                                            y: rect.top + rect.height / 2}));
+        }
+    }).observe(document, {subtree: true, attributes: true, attributeFilter: ['class'], attributeOldValue: true});
+})
+"""
+
+# Clicks the elements at the points (%s) until the level advances or the board is gone, all of them in the
+# same task, so the board cannot start accepting clicks halfway through a replay
+SEQUENCE_REPLAY_JS = r"""
+((hbSelectors) => hbReplaySequence(
+    () => %s.forEach(([x, y]) => hbClick(document.elementFromPoint(x, y))), %d, %d))
+"""
+
+async def replay_sequence(session: CDPSession, points: list) -> dict:
+    """
+    Replays a sequence memory level in the page in one command, again every REPLAY_RETRY_MS until the level
+    advances. Sending the clicks one by one would let the board start accepting them halfway through a
+    replay, and the rest of it would then be taken as wrong answers.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        points (list): The (x, y) centres of the squares in CSS pixels, in order.
+
+    Returns:
+        dict: How many times it was replayed under "replays", and whether the level advanced under "advanced".
+    """
+    script = SEQUENCE_REPLAY_JS % (json.dumps(points), REPLAY_RETRY_MS, REPLAY_TIMEOUT_MS)
+    return await session.evaluate(with_selectors(script), await_promise=True)
+
+async def sequence(session: CDPSession, stop, timeout: float = 5) -> int:
+    """
+    Runs the sequence memory test, collecting the squares from the page's notifications as they light up
+    and replaying them once the last one went dark. As the board only accepts clicks a moment after the
+    last square went dark, the replay is repeated until the level advances.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        stop (callable): Called with the current level, the test stops when it returns True.
+        timeout (float, optional): Seconds to wait for a level, plus one per level. Defaults to 5.
+
+    Returns:
+        int: The last level that was reached.
+    """
+    await session.evaluate(with_selectors(SEQUENCE_WATCHER_JS))
+    await session.click_selector(locators.start_button.selector)
+
+    level_number = 0
+    start = time.perf_counter()
+
+    while not stop(level_number):
+        level_start = time.perf_counter()
+        flashes = []
+        try:
+            # The sequence is complete once as many squares as the level lit up and the last one went dark
+            while True:
+                event = await asyncio.wait_for(session.notifications.get(), timeout + level_number)
+                if event["type"] == "closed":
+                    raise ConnectionError("The DevTools websocket was closed")
+                if event["type"] == "flash":
+                    flashes.append(event)
+                elif event["type"] == "dim" and flashes and len(flashes) >= event["level"]:
+                    break
+        except asyncio.TimeoutError:
+            print("Sequence Memory test completed or failed.")
+            break
+
+        level_number = flashes[-1]["level"]
+        replay = await replay_sequence(session, [(flash["x"], flash["y"]) for flash in flashes[:level_number]])
+        if not replay["advanced"]:
+            print("The board did not accept the sequence.")
+            break
+
+        # Forget the flashes caused by the clicks
+        await asyncio.sleep(0.05)
+        session.discard_notifications()
+        print(f"Level {level_number}: replayed {[flash['index'] for flash in flashes[:level_number]]} "
+              f"{replay['replays']} time(s) after {(time.perf_counter() - level_start) * 1000:.0f} ms")
+
+    else:
+        print("Stopping test...")
+
+    elapsed = time.perf_counter() - start
+    if level_number:
+        print(f"Reached level {level_number} at {level_number / elapsed:.2f} levels per second")
+    return level_number
@@ -0,0 +1,196 @@
+"""
+Reuse of Chrome sessions across tests.
+
+A DriverPool launches a few browsers up front, prepares them once (e.g. clears the consent banner)
+and hands them out to the tests one after another, so a run of several tests does not pay a Chrome
+cold start per test. Every browser it launched is quit when the pool is closed.
+"""
+import queue
+import threading
+import time
+
+from selenium import webdriver
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+class DriverPool:
+    """
+    A pool of pre-launched Chrome sessions.
+
+    Args:
+        options (webdriver.ChromeOptions): The options every browser is launched with.
+        size (int, optional): Number of browsers launched up front. Defaults to 1.
+        warm_up (callable, optional): Called with every new driver before it is handed out. Defaults to None.
+    """
+    def __init__(self, options: webdriver.ChromeOptions, size: int = 1, warm_up=None):
+        self.options = options
+        self.size = size
+        self.warm_up = warm_up
+        self.drivers = []
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    def launch(self) -> webdriver.Chrome:
+        """
+        Launches and warms up a new browser owned by the pool.
+
+        Returns:
+            webdriver.Chrome: The new driver.
+        """
+        driver = webdriver.Chrome(options=self.options)
+        with self.lock:
+            self.drivers.append(driver)
+        if self.warm_up:
+            self.warm_up(driver)
+        return driver
+
+    def start(self) -> None:
+        """
+        Launches the browsers of the pool in parallel.
+
+        Returns:
+            None
+        """
+        threads = [threading.Thread(target=lambda: self.idle.put(self.launch())) for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def acquire(self) -> webdriver.Chrome:
+        """
+        Hands out an idle browser, launching a new one if none is left.
+
+        Returns:
+            webdriver.Chrome: The driver, reserved until it is released.
+        """
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.launch()
+
+    def release(self, driver: webdriver.Chrome) -> None:
+        """
+        Gives a browser back to the pool, or forgets it if the test closed it.
+
+        Args:
+            driver (webdriver.Chrome): A driver returned by acquire.
+
+        Returns:
+            None
+        """
+        try:
+            driver.window_handles
+        except Exception:
+            with self.lock:
+                if driver in self.drivers:
+                    self.drivers.remove(driver)
+            return
+        self.idle.put(driver)
+
+    def close(self) -> None:
+        """
+        Quits every browser launched by the pool.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def browser_memory(driver: webdriver.Chrome) -> int:
+    """
+    Measures the resident memory of a driver's chromedriver and browser processes.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+
+    Returns:
+        int: The memory in bytes or None if psutil is not installed or the processes are gone.
+    """
+    if psutil is None:
+        return None
+
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        return sum(child.memory_info().rss for child in [process] + process.children(recursive=True))
+    except (psutil.Error, AttributeError):
+        return None
+
+class MemorySampler:
+    """
+    Samples the memory of a driver's processes in the background and keeps the peak.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        interval (float, optional): Seconds between two samples. Defaults to 0.5.
+    """
+    def __init__(self, driver: webdriver.Chrome, interval: float = 0.5):
+        self.driver = driver
+        self.interval = interval
+        self.peak = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self) -> None:
+        while True:
+            memory = browser_memory(self.driver)
+            if memory is not None:
+                self.peak = max(self.peak or 0, memory)
+            if self.stopped.wait(self.interval):
+                break
+
+    def __enter__(self):
+        if psutil is not None:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+def run_in_pool(pool: DriverPool, open_page, test_function) -> dict:
+    """
+    Runs a test on a browser of the pool and measures it.
+
+    Args:
+        pool (DriverPool): The pool to take the browser from.
+        open_page (callable): Called with the driver to navigate to the test and wait until it can start.
+        test_function (callable): Called with the driver to run the test.
+
+    Returns:
+        dict: The test's result, its setup time and duration in seconds, its round trips if the driver counts
+            them and the peak memory of the browser in bytes.
+    """
+    setup_start = time.perf_counter()
+    driver = pool.acquire()
+    try:
+        with MemorySampler(driver) as sampler:
+            open_page(driver)
+            start = time.perf_counter()
+            round_trips = getattr(driver, "round_trips", None)
+            result = test_function(driver)
+            duration = time.perf_counter() - start
+            if round_trips is not None:
+                round_trips = driver.round_trips - round_trips
+    finally:
+        pool.release(driver)
+
+    return {"result": result, "setup_time": start - setup_start, "duration": duration, "round_trips": round_trips,
+            "peak_memory": sampler.peak}
@@ -0,0 +1,204 @@
+"""
+Instrumentation of the WebDriver commands sent by the bot.
+
+Every command (find, click, .text, get_attribute, scripts, ...) is an HTTP round trip to chromedriver.
+Once attached to a driver, an Instrumentation records each command's name, locator, duration and the
+test and level it belongs to, plus the time spent inside WebDriverWait. The records can be exported as
+a Chrome trace-event JSON (open it in chrome://tracing or https://ui.perfetto.dev) and summarised per test.
+
+Nothing is wrapped until attach is called, so a driver without instrumentation pays no overhead.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.support.ui import WebDriverWait
+
+class Instrumentation:
+    """
+    Records the WebDriver commands of one driver.
+    """
+    def __init__(self):
+        self.events = []
+        self.test = None
+        self.level = None
+        self.waiting = 0
+        self.origin = time.perf_counter()
+
+    def attach(self, driver: webdriver.Chrome) -> None:
+        """
+        Starts recording every command the driver (and its elements) sends.
+
+        Args:
+            driver (webdriver.Chrome): The web driver instance for controlling the browser.
+
+        Returns:
+            None
+        """
+        execute = driver.execute
+
+        def recorded_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.record(driver_command, start, time.perf_counter(), locator(driver_command, params))
+
+        driver.execute = recorded_execute
+        driver.instrumentation = self
+        instrument_waits()
+
+    def record(self, name: str, start: float, end: float, detail: str = None, kind: str = None) -> None:
+        """
+        Records one event.
+
+        Args:
+            name (str): The name of the command or span.
+            start (float): Its start, from time.perf_counter.
+            end (float): Its end, from time.perf_counter.
+            detail (str, optional): The locator or script of a command. Defaults to None.
+            kind (str, optional): "wait", "script", "act" or "test". Defaults to the kind of the command.
+
+        Returns:
+            None
+        """
+        if kind is None:
+            kind = "wait" if self.waiting else "script" if name == Command.W3C_EXECUTE_SCRIPT_ASYNC else "act"
+        self.events.append({"name": name, "kind": kind, "start": start, "duration": end - start,
+                            "detail": detail, "test": self.test, "level": self.level})
+
+    @contextmanager
+    def test_section(self, test_name: str):
+        """
+        Attributes the commands sent inside the with block to a test.
+
+        Args:
+            test_name (str): The name of the test.
+        """
+        self.test, self.level = test_name, None
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.record(test_name, start, time.perf_counter(), kind="test")
+            self.test = None
+
+    def summary(self) -> dict:
+        """
+        Summarises the recorded commands per test.
+
+        Returns:
+            dict: Per test, the amount of round trips and the seconds spent waiting, in page scripts and acting.
+        """
+        tests = {}
+        for event in self.events:
+            if event["kind"] == "test":
+                continue
+            test = tests.setdefault(event["test"] or "no test", {"round_trips": 0, "wait": 0.0, "script": 0.0, "act": 0.0})
+            if event["name"] != "WebDriverWait":
+                test["round_trips"] += 1
+            # Commands sent inside a wait are already part of the wait's span
+            if event["kind"] != "wait" or event["name"] == "WebDriverWait":
+                test[event["kind"]] += event["duration"]
+        return tests
+
+    def print_summary(self) -> None:
+        """
+        Prints the summary of every test.
+
+        Returns:
+            None
+        """
+        print(f"\n{'Test':<18}{'Round trips':>13}{'Waiting':>10}{'Scripts':>10}{'Acting':>10}")
+        for test, totals in self.summary().items():
+            print(f"{test.title():<18}{totals['round_trips']:>13}{totals['wait']:>9.2f}s"
+                  f"{totals['script']:>9.2f}s{totals['act']:>9.2f}s")
+
+    def export_chrome_trace(self, path: str) -> None:
+        """
+        Writes the recorded events as a Chrome trace-event JSON file.
+
+        Args:
+            path (str): The file to write.
+
+        Returns:
+            None
+        """
+        trace_events = [{
+            "name": event["name"],
+            "cat": event["kind"],
+            "ph": "X",
+            "ts": (event["start"] - self.origin) * 1e6,
+            "dur": event["duration"] * 1e6,
+            "pid": os.getpid(),
+            "tid": 1,
+            "args": {"detail": event["detail"], "test": event["test"], "level": event["level"]},
+        } for event in self.events]
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
+
+def locator(driver_command: str, params: dict) -> str:
+    """
+    Describes what a command targets.
+
+    Args:
+        driver_command (str): The name of the WebDriver command.
+        params (dict): Its parameters.
+
+    Returns:
+        str: The locator, the start of the script or the element id, or None.
+    """
+    if not params:
+        return None
+    if "using" in params:
+        return f"{params['using']}={params['value']}"
+    if "script" in params:
+        return " ".join(params["script"].split())[:80]
+    return params.get("id")
+
+def mark_level(driver: webdriver.Chrome, level: int) -> None:
+    """
+    Attributes the next commands of an instrumented driver to a level.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        level (int): The current level.
+
+    Returns:
+        None
+    """
+    instrumentation = getattr(driver, "instrumentation", None)
+    if instrumentation is not None:
+        instrumentation.level = level
+
+def instrument_waits() -> None:
+    """
+    Makes WebDriverWait record its span on instrumented drivers, done once per process.
+
+    Returns:
+        None
+    """
+    if getattr(WebDriverWait.until, "instrumented", False):
+        return
+
+    for method_name in ["until", "until_not"]:
+        def instrumented(self, method, message="", original=getattr(WebDriverWait, method_name)):
+            instrumentation = getattr(self._driver, "instrumentation", None)
+            if instrumentation is None:
+                return original(self, method, message)
+
+            start = time.perf_counter()
+            instrumentation.waiting += 1
+            try:
+                return original(self, method, message)
+            finally:
+                instrumentation.waiting -= 1
+                condition = getattr(method, "__qualname__", "").split(".")[0] or None
+                instrumentation.record("WebDriverWait", start, time.perf_counter(), condition, kind="wait")
+
+        instrumented.instrumented = True
+        setattr(WebDriverWait, method_name, instrumented)
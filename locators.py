@@ -0,0 +1,170 @@
+"""
+Registry of every element the bot looks up.
+
+Each Locator is built once at import with a CSS selector, which Chrome matches faster than XPath and
+which the page scripts share, and an optional fallback that does not depend on the site's hashed class
+names (css-de05nr, e19owgy78, ...). A Locator unpacks to its active (By, value) pair, so it can be passed
+wherever Selenium expects a locator tuple. check_page validates the selectors against the open page and
+switches a locator to its fallback when only the fallback matches.
+"""
+import json
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+class Locator:
+    """
+    An element the bot looks up.
+
+    Args:
+        name (str): The name of the element, also its key in the page scripts' hbSelectors.
+        css (str, optional): The CSS selector. Defaults to None for elements CSS cannot express.
+        fallback (tuple, optional): A (By, value) pair used when the CSS selector stops matching.
+            Defaults to None.
+    """
+    def __init__(self, name: str, css: str = None, fallback: tuple = None):
+        self.name = name
+        self.css = css
+        self.fallback = fallback
+        self.active = (By.CSS_SELECTOR, css) if css else fallback
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __repr__(self):
+        return f"Locator({self.name!r}, {self.active[0]}={self.active[1]!r})"
+
+    @property
+    def selector(self) -> str:
+        """
+        The CSS selector page scripts use, the fallback's once the locator switched to a CSS fallback.
+        """
+        if self.active[0] == By.CSS_SELECTOR:
+            return self.active[1]
+        return self.css
+
+    def use_fallback(self) -> None:
+        """
+        Switches the locator to its fallback.
+
+        Returns:
+            None
+        """
+        self.active = self.fallback
+
+start_button = Locator(
+    "start_button", "button.css-de05nr.e19owgy710",
+    (By.XPATH, "//button[normalize-space()='Start' or normalize-space()='Start Test' or normalize-space()='Continue'"
+               " or normalize-space()='NEXT' or normalize-space()='Submit']"))
+consent_button = Locator("consent_button", "button.fc-cta-consent", (By.XPATH, "//button[normalize-space()='Consent']"))
+ad_close = Locator("ad_close", "div[style^='grid-column: 4 / 4; place-self: center right; cursor: pointer;']")
+level = Locator("level", "span[class='css-dd6wi1'] span:nth-of-type(2)",
+                (By.XPATH, "//span[span[1][normalize-space()='Level']]/span[2]"))
+score = Locator("score", "h1[class*='css-0']")
+
+reaction_start = Locator("reaction_start", "div[class*='view-splash']")
+reaction_go = Locator("reaction_go", "div[class*='view-go']")
+reaction_result = Locator("reaction_result", "div[class*='view-result']")
+reaction_time = Locator("reaction_time", "div[class*='view-result'] div[class='css-1qvtbrk e19owgy78'] > h1",
+                        (By.CSS_SELECTOR, "div[class*='view-result'] h1"))
+aim_target = Locator("aim_target", "div[class^='css-17nnhwz'][style^='width: 100px']",
+                     (By.CSS_SELECTOR, "div[style^='width: 100px; height: 100px']"))
+chimp_cell = Locator("chimp_cell", "div[data-cellnumber]")
+typing_window = Locator("typing_window", "div.letters.notranslate")
+typing_letter = Locator("typing_letter", "span.incomplete")
+sequence_square = Locator("sequence_square", "div.square")
+sequence_active = Locator("sequence_active", "div.square.active")
+number_shown = Locator("number_shown", "div.big-number")
+number_input = Locator("number_input", "form div[class='css-1qvtbrk e19owgy78'] > input[type='text']",
+                       (By.CSS_SELECTOR, "form input[type='text']"))
+verbal_word = Locator("verbal_word", "div.word")
+verbal_seen = Locator("verbal_seen", fallback=(By.XPATH, "//button[text()='SEEN']"))
+verbal_new = Locator("verbal_new", fallback=(By.XPATH, "//button[text()='NEW']"))
+verbal_score = Locator("verbal_score", "span[class*='score']")
+verbal_lives = Locator("verbal_lives", "span[class*='lives']")
+visual_cell = Locator("visual_cell", "div[class*='css-lxtdud eut2yre1']",
+                      (By.CSS_SELECTOR, "div[style*='grid-template-columns'] > div"))
+
+registry = {locator.name: locator for locator in [
+    start_button, consent_button, ad_close, level, score, reaction_start, reaction_go, reaction_result,
+    reaction_time, aim_target, chimp_cell, typing_window, typing_letter, sequence_square, sequence_active,
+    number_shown, number_input, verbal_word, verbal_seen, verbal_new, verbal_score, verbal_lives, visual_cell,
+]}
+
+# The element every test can be started with
+start_locators = {
+    "reaction time": reaction_start,
+    "aim trainer": aim_target,
+    "chimp test": start_button,
+    "typing": typing_window,
+    "sequence memory": start_button,
+    "number memory": start_button,
+    "verbal memory": start_button,
+    "visual memory": start_button,
+}
+
+def page_selectors_js() -> str:
+    """
+    Declares the CSS selectors of the registry for a page script.
+
+    Returns:
+        str: A `const hbSelectors = {...};` statement.
+    """
+    return f"const hbSelectors = {selectors_json()};\n"
+
+def selectors_json() -> str:
+    """
+    Serialises the CSS selectors of the registry.
+
+    Returns:
+        str: A JSON object of the selectors by locator name.
+    """
+    return json.dumps({name: locator.selector for name, locator in registry.items() if locator.selector})
+
+# Counts the matches of every selector, -1 if it is invalid
+COUNT_MATCHES_JS = r"""
+const count = (using, value) => {
+    try {
+        if (using === 'css selector') return document.querySelectorAll(value).length;
+        return document.evaluate('count(' + value + ')', document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+    } catch (error) {
+        return -1;
+    }
+};
+return arguments[0].map(([name, css, using, value]) => [name, css ? count('css selector', css) : null,
+                                                         using ? count(using, value) : null]);
+"""
+
+def check_page(driver: webdriver.Chrome, expected: list = ()) -> dict:
+    """
+    Validates every selector of the registry against the open page in a single round trip. The expected
+    locators must match: those whose CSS selector no longer does but whose fallback does are switched to
+    the fallback.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        expected (list, optional): The locators which should be in the page. Defaults to none.
+
+    Returns:
+        dict: The status of every locator: "ok", "invalid", "fallback" or "missing".
+    """
+    entries = [[name, locator.css, *(locator.fallback or (None, None))] for name, locator in registry.items()]
+    counts = driver.execute_script(COUNT_MATCHES_JS, entries)
+
+    expected_names = {locator.name for locator in expected}
+    statuses = {}
+    for name, css_count, fallback_count in counts:
+        locator = registry[name]
+        if css_count == -1 or fallback_count == -1:
+            statuses[name] = "invalid"
+        elif name not in expected_names or (css_count if locator.css else fallback_count):
+            statuses[name] = "ok"
+        elif fallback_count:
+            locator.use_fallback()
+            statuses[name] = "fallback"
+        else:
+            statuses[name] = "missing"
+
+        if statuses[name] != "ok":
+            print(f"Locator {name}: {statuses[name]} ({locator.active[0]}={locator.active[1]})")
+    return statuses
@@ -0,0 +1,743 @@
+"""
+Offline stand-in for the Human Benchmark website.
+
+Serves one page per test under the same paths as the live site (/tests/reactiontime, /tests/aim, ...)
+and reproduces the DOM contracts HumanBenchmark_Bot.py relies on (view-splash/view-go, css-17nnhwz
+targets, data-cellnumber, 'square active', big-number, word/score/lives spans, the e19owgy710 button).
+
+Every page accepts the following query parameters:
+    seed       Seed of the page's random generator, so runs are reproducible. Defaults to 1.
+    speed      Factor applied to every animation and delay of the page. Defaults to 1.
+    max_level  Ends the game after this many levels/rounds (0 = only end on failure). Defaults to 0.
+    consent    Show the consent banner (1) or not (0). Defaults to 1.
+    ad         Show the blocking ad (1) or not (0). Defaults to 1.
+
+When a test ends, the page stores its result in window.benchmarkResult.
+
+When started with a fixtures directory, /replay/<name> replays the DOM session recorded in
+<name>.json by replay.py (see REPLAY_JS), accepting a speed query parameter as well.
+
+The consent banner and the ad are added by scripts served under paths named after their real hosts
+(see THIRD_PARTY_SCRIPTS), so blocking those hosts' URL patterns also blocks them offline.
+"""
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CSS = """
+body { margin: 0; font-family: sans-serif; background: #2b87d1; color: #fff; }
+#root { min-height: 100vh; display: flex; flex-direction: column; align-items: center; justify-content: center; }
+button.e19owgy710 { background: #ffd154; border: 0; padding: 12px 28px; font-size: 18px; cursor: pointer; margin: 8px; }
+.view-splash { background: rgb(43, 135, 209); }
+.view-waiting { background: rgb(206, 38, 54); }
+.view-go { background: rgb(75, 219, 106); }
+.view-result, .view-error { background: rgb(43, 135, 209); }
+.e18o0sx0 { position: absolute; inset: 0; display: flex; flex-direction: column; align-items: center; justify-content: center; user-select: none; }
+.css-17nnhwz { position: absolute; border-radius: 50%; background: #fff; cursor: crosshair; }
+.chimp-board { display: grid; grid-template-columns: repeat(8, 80px); grid-template-rows: repeat(5, 80px); gap: 6px; }
+.css-19b5rdt { border: 3px solid rgba(255, 255, 255, .5); border-radius: 8px; font-size: 36px; display: flex; align-items: center; justify-content: center; cursor: pointer; }
+.css-19b5rdt.hidden-number { background: #fff; color: transparent; }
+.css-19b5rdt.done { visibility: hidden; }
+.letters { width: 700px; font-size: 22px; line-height: 1.6; background: #fff; color: #888; padding: 16px; outline: none; }
+.letters .correct { color: #4bdb6a; }
+.letters .incorrect { color: #ce2636; }
+.letters .current { border-left: 2px solid #000; }
+.squares { display: grid; gap: 12px; }
+.square-row { display: flex; gap: 12px; }
+.square { width: 100px; height: 100px; border-radius: 8px; background: rgba(0, 0, 0, .15); cursor: pointer; }
+.square.active { background: #fff; }
+.big-number { font-size: 64px; }
+.word { font-size: 48px; margin: 24px; }
+.css-hvbk5q { display: grid; gap: 8px; width: 400px; height: 400px; }
+.css-lxtdud { border-radius: 6px; background: rgba(0, 0, 0, .2); cursor: pointer; }
+.css-lxtdud.active { background: #fff; }
+.css-lxtdud.error { background: #222; }
+.fc-consent-root { position: fixed; inset: 0; background: rgba(0, 0, 0, .6); display: flex; align-items: center; justify-content: center; z-index: 10; }
+.ad-banner { position: fixed; left: 0; right: 0; bottom: 0; height: 90px; background: #ddd; display: grid; grid-template-columns: repeat(4, 1fr); z-index: 5; }
+"""
+
+COMMON_JS = r"""
+const params = new URLSearchParams(location.search);
+const seed = parseInt(params.get('seed') || '1', 10);
+const speed = parseFloat(params.get('speed') || '1');
+const maxLevel = parseInt(params.get('max_level') || '0', 10);
+const root = document.getElementById('root');
+
+function mulberry32(a) {
+    return function () {
+        a |= 0; a = a + 0x6D2B79F5 | 0;
+        let t = Math.imul(a ^ a >>> 15, 1 | a);
+        t = t + Math.imul(t ^ t >>> 7, 61 | t) ^ t;
+        return ((t ^ t >>> 14) >>> 0) / 4294967296;
+    };
+}
+const random = mulberry32(seed);
+function randint(lo, hi) { return lo + Math.floor(random() * (hi - lo + 1)); }
+function later(fn, ms) { return setTimeout(fn, ms / speed); }
+
+function el(tag, attrs, text) {
+    const node = document.createElement(tag);
+    for (const [key, value] of Object.entries(attrs || {})) node.setAttribute(key, value);
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+function button(label, onClick) {
+    const node = el('button', {class: 'css-de05nr e19owgy710'}, label);
+    node.addEventListener('click', onClick);
+    return node;
+}
+function levelHeader(level) {
+    const header = el('span', {class: 'css-dd6wi1'});
+    header.appendChild(el('span', {}, 'Level'));
+    header.appendChild(el('span', {}, String(level)));
+    return header;
+}
+function finish(score, level) {
+    window.benchmarkResult = {score: score, level: level};
+    root.innerHTML = '';
+    root.appendChild(el('h1', {class: 'css-0'}, String(score)));
+    root.appendChild(el('p', {}, 'Game over'));
+}
+function reachedMaxLevel(level) { return maxLevel > 0 && level > maxLevel; }
+"""
+
+CONSENT_JS = r"""
+if (params.get('consent') !== '0') {
+    later(() => {
+        const banner = el('div', {class: 'fc-consent-root'});
+        const accept = el('button', {class: 'fc-button fc-cta-consent fc-primary-button'}, 'Consent');
+        accept.addEventListener('click', () => banner.remove());
+        banner.appendChild(accept);
+        document.body.appendChild(banner);
+    }, 300);
+}
+"""
+
+AD_JS = r"""
+if (params.get('ad') !== '0') {
+    later(() => {
+        const banner = el('div', {class: 'ad-banner'});
+        const close = el('div', {style: 'grid-column: 4 / 4; place-self: center right; cursor: pointer;'}, 'X');
+        close.addEventListener('click', () => banner.remove());
+        banner.appendChild(close);
+        document.body.appendChild(banner);
+    }, 800);
+}
+"""
+
+REACTION_TIME_JS = r"""
+const box = el('div', {class: 'e18o0sx0 css-saet2v view-splash'});
+root.appendChild(box);
+let state = 'splash', goAt = 0, timer = null;
+const results = [];
+
+function show(view, title, detail) {
+    box.className = 'e18o0sx0 css-saet2v ' + view;
+    box.innerHTML = '';
+    const wrapper = el('div', {class: 'css-1qvtbrk e19owgy78'});
+    wrapper.appendChild(el('h1', {}, title));
+    box.appendChild(wrapper);
+    if (detail) box.appendChild(el('p', {}, detail));
+}
+function wait() {
+    state = 'waiting';
+    show('view-waiting', '...', 'Wait for green');
+    timer = later(() => {
+        state = 'go';
+        show('view-go', 'Click!');
+        goAt = performance.now();
+    }, randint(1500, 4500));
+}
+box.addEventListener('mousedown', () => {
+    if (state === 'splash' || state === 'result' || state === 'error') {
+        wait();
+    } else if (state === 'waiting') {
+        clearTimeout(timer);
+        state = 'error';
+        show('view-error', 'Too soon!', 'Click to try again.');
+    } else if (state === 'go') {
+        const ms = Math.round(performance.now() - goAt);
+        results.push(ms);
+        window.benchmarkResult = {score: Math.min(...results), attempts: results.slice()};
+        state = 'result';
+        show('view-result', ms + 'ms', 'Click to keep going');
+    }
+});
+show('view-splash', 'Reaction Time Test', 'When the red box turns green, click as quickly as you can.');
+"""
+
+AIM_JS = r"""
+const total = 30;
+let remaining = total, spawnedAt = 0, elapsed = 0;
+const counter = el('div', {class: 'css-1k4dpwl e6yfngs2'});
+counter.appendChild(el('span', {}, 'Remaining'));
+const remainingSpan = el('span', {}, String(remaining));
+counter.appendChild(remainingSpan);
+const area = el('div', {class: 'css-1k4dpwl e6yfngs0', style: 'position: relative; width: 1000px; height: 500px;'});
+root.appendChild(counter);
+root.appendChild(area);
+
+function target(left, top, onHit) {
+    const node = el('div', {class: 'css-17nnhwz e6yfngs4',
+        style: 'width: 100px; height: 100px; left: ' + left + 'px; top: ' + top + 'px;'});
+    node.addEventListener('mousedown', onHit);
+    area.appendChild(node);
+}
+function spawn() {
+    spawnedAt = performance.now();
+    target(randint(0, 900), randint(0, 400), (event) => {
+        elapsed += performance.now() - spawnedAt;
+        event.currentTarget.remove();
+        remaining -= 1;
+        remainingSpan.textContent = String(remaining);
+        if (remaining === 0) {
+            finish(Math.round(elapsed / total) + 'ms', total);
+        } else {
+            spawn();
+        }
+    });
+}
+target(450, 200, (event) => { event.currentTarget.remove(); spawn(); });
+area.appendChild(el('p', {}, 'Click the target above to begin.'));
+"""
+
+CHIMP_JS = r"""
+let numbers = 4, strikes = 0;
+
+function intro() {
+    root.innerHTML = '';
+    root.appendChild(el('h1', {}, 'Are You Smarter Than a Chimpanzee?'));
+    root.appendChild(button('Start Test', level));
+}
+function level() {
+    root.innerHTML = '';
+    const board = el('div', {class: 'chimp-board'});
+    const cells = [];
+    for (let i = 0; i < 40; i++) cells.push(i);
+    for (let i = cells.length - 1; i > 0; i--) {
+        const j = Math.floor(random() * (i + 1));
+        [cells[i], cells[j]] = [cells[j], cells[i]];
+    }
+    const taken = new Map();
+    cells.slice(0, numbers).forEach((cell, i) => taken.set(cell, i + 1));
+    let next = 1;
+    for (let i = 0; i < 40; i++) {
+        if (!taken.has(i)) { board.appendChild(el('div', {class: 'css-1b1l0qg'})); continue; }
+        const value = taken.get(i);
+        const node = el('div', {class: 'css-19b5rdt', 'data-cellnumber': String(value)}, String(value));
+        node.addEventListener('mousedown', () => {
+            if (node.classList.contains('done')) return;
+            if (value !== next) { strikes += 1; return summary(false); }
+            if (next === 1) board.querySelectorAll('[data-cellnumber]').forEach((cell) => cell.classList.add('hidden-number'));
+            node.classList.add('done');
+            next += 1;
+            if (next > numbers) summary(true);
+        });
+        board.appendChild(node);
+    }
+    root.appendChild(board);
+}
+function summary(passed) {
+    const reached = passed ? numbers : numbers - 1;
+    if (strikes >= 3 || (passed && (numbers >= 40 || reachedMaxLevel(numbers - 2)))) return finish(reached, numbers - 3);
+    if (passed) numbers += 1;
+    root.innerHTML = '';
+    root.appendChild(el('p', {}, 'NUMBERS'));
+    root.appendChild(el('h1', {}, String(numbers)));
+    root.appendChild(el('p', {}, 'STRIKES ' + strikes + ' of 3'));
+    root.appendChild(button('Continue', level));
+}
+intro();
+"""
+
+TYPING_JS = r"""
+const words = ['the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'memory', 'reaction',
+    'benchmark', 'human', 'typing', 'speed', 'practice', 'keyboard', 'sentence', 'rhythm', 'accurate',
+    'letters', 'window', 'simple', 'because', 'number', 'little', 'between', 'another', 'people'];
+const length = parseInt(params.get('length') || '250', 10);
+const passageWords = [];
+while (passageWords.join(' ').length < length) passageWords.push(words[randint(0, words.length - 1)]);
+const passage = passageWords.join(' ') + '.';
+
+const letters = el('div', {class: 'letters notranslate', tabindex: '1'});
+const spans = [];
+for (const ch of passage) {
+    const span = el('span', {class: 'incomplete'}, ch);
+    spans.push(span);
+    letters.appendChild(span);
+}
+spans[0].classList.add('current');
+root.appendChild(letters);
+
+let position = 0, correct = 0, startedAt = 0;
+letters.addEventListener('keydown', (event) => {
+    if (event.key.length !== 1 || position >= spans.length) return;
+    event.preventDefault();
+    if (position === 0) startedAt = performance.now();
+    const span = spans[position];
+    const hit = event.key === passage[position];
+    if (hit) correct += 1;
+    span.className = hit ? 'correct' : 'incorrect';
+    position += 1;
+    if (position < spans.length) {
+        spans[position].classList.add('current');
+        return;
+    }
+    const minutes = Math.max(performance.now() - startedAt, 1) / 60000;
+    finish(Math.round(correct / 5 / minutes) + 'wpm', 1);
+});
+"""
+
+SEQUENCE_JS = r"""
+const sequence = [];
+let level = 1, position = 0, accepting = false;
+const squares = [];
+
+function intro() {
+    root.innerHTML = '';
+    root.appendChild(el('h1', {}, 'Sequence Memory Test'));
+    root.appendChild(button('Start', start));
+}
+function start() {
+    root.innerHTML = '';
+    root.appendChild(levelHeader(level));
+    const grid = el('div', {class: 'squares'});
+    for (let r = 0; r < 3; r++) {
+        const row = el('div', {class: 'square-row'});
+        for (let c = 0; c < 3; c++) {
+            const square = el('div', {class: 'square'});
+            const index = squares.length;
+            square.addEventListener('mousedown', () => press(index));
+            squares.push(square);
+            row.appendChild(square);
+        }
+        grid.appendChild(row);
+    }
+    root.appendChild(grid);
+    nextLevel();
+}
+function nextLevel() {
+    root.querySelector('.css-dd6wi1 span:nth-child(2)').textContent = String(level);
+    sequence.push(randint(0, 8));
+    position = 0;
+    accepting = false;
+    let delay = 600;
+    sequence.forEach((index) => {
+        later(() => { squares[index].className = 'square active'; }, delay);
+        later(() => { squares[index].className = 'square'; }, delay + 400);
+        delay += 550;
+    });
+    later(() => { accepting = true; }, delay);
+}
+function press(index) {
+    if (!accepting) return;
+    if (index !== sequence[position]) return finish(level - 1, level);
+    position += 1;
+    if (position < sequence.length) return;
+    level += 1;
+    if (reachedMaxLevel(level)) return finish(level - 1, level - 1);
+    nextLevel();
+}
+intro();
+"""
+
+NUMBER_JS = r"""
+let level = 1;
+
+function intro() {
+    root.innerHTML = '';
+    root.appendChild(el('h1', {}, 'Number Memory'));
+    root.appendChild(button('Start', show));
+}
+function show() {
+    let digits = String(randint(1, 9));
+    while (digits.length < level) digits += String(randint(0, 9));
+    root.innerHTML = '';
+    root.appendChild(el('div', {class: 'big-number '}, digits));
+    later(() => ask(digits), 1000 + 600 * level);
+}
+function ask(digits) {
+    root.innerHTML = '';
+    const form = el('form');
+    form.appendChild(el('p', {}, 'What was the number?'));
+    const wrapper = el('div', {class: 'css-1qvtbrk e19owgy78'});
+    const input = el('input', {type: 'text', autocomplete: 'off'});
+    wrapper.appendChild(input);
+    form.appendChild(wrapper);
+    const submit = el('button', {class: 'css-de05nr e19owgy710', type: 'submit'}, 'Submit');
+    form.appendChild(submit);
+    form.addEventListener('submit', (event) => {
+        event.preventDefault();
+        answer(digits, input.value.trim());
+    });
+    root.appendChild(form);
+    input.focus();
+}
+function answer(digits, given) {
+    if (given !== digits) return finish(level - 1, level);
+    if (reachedMaxLevel(level + 1)) return finish(level, level);
+    root.innerHTML = '';
+    root.appendChild(el('p', {}, 'Number'));
+    root.appendChild(el('h1', {}, digits));
+    root.appendChild(levelHeader(level));
+    level += 1;
+    root.appendChild(button('NEXT', show));
+}
+intro();
+"""
+
+VERBAL_JS = r"""
+const syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'to', 'vi', 'ze', 'po', 'da', 'fe', 'gu', 'hi', 'ja', 'bo'];
+const seen = [], seenSet = new Set();
+let lives = 3, score = 0, rounds = 0, current = null;
+let livesSpan, scoreSpan, wordDiv;
+
+function freshWord() {
+    let word;
+    do {
+        word = '';
+        const count = randint(2, 4);
+        for (let i = 0; i < count; i++) word += syllables[randint(0, syllables.length - 1)];
+    } while (seenSet.has(word));
+    return word;
+}
+function intro() {
+    root.innerHTML = '';
+    root.appendChild(el('h1', {}, 'Verbal Memory'));
+    root.appendChild(button('Start', start));
+}
+function start() {
+    root.innerHTML = '';
+    const header = el('div');
+    livesSpan = el('span', {class: 'css-1gx7h0p lives'}, 'Lives | 3');
+    scoreSpan = el('span', {class: 'css-1gx7h0p score'}, 'Score | 0');
+    header.appendChild(livesSpan);
+    header.appendChild(el('span', {}, ' '));
+    header.appendChild(scoreSpan);
+    root.appendChild(header);
+    wordDiv = el('div', {class: 'word'});
+    root.appendChild(wordDiv);
+    const buttons = el('div');
+    buttons.appendChild(button('SEEN', () => answer(true)));
+    buttons.appendChild(button('NEW', () => answer(false)));
+    root.appendChild(buttons);
+    next();
+}
+function next() {
+    current = seen.length > 0 && random() < 0.45 ? seen[randint(0, seen.length - 1)] : freshWord();
+    wordDiv.textContent = current;
+}
+function answer(saidSeen) {
+    const wasSeen = seenSet.has(current);
+    if (saidSeen === wasSeen) score += 1; else lives -= 1;
+    if (!wasSeen) { seen.push(current); seenSet.add(current); }
+    rounds += 1;
+    livesSpan.textContent = 'Lives | ' + lives;
+    scoreSpan.textContent = 'Score | ' + score;
+    if (lives <= 0 || reachedMaxLevel(rounds + 1)) return finish(score, rounds);
+    next();
+}
+intro();
+"""
+
+VISUAL_JS = r"""
+let level = 1, lives = 3, mistakes = 0, found = 0, accepting = false;
+let grid, cells, pattern;
+
+function gridSize(level) {
+    if (level <= 2) return 3;
+    if (level <= 5) return 4;
+    if (level <= 9) return 5;
+    if (level <= 14) return 6;
+    return 7;
+}
+function intro() {
+    root.innerHTML = '';
+    root.appendChild(el('h1', {}, 'Visual Memory Test'));
+    root.appendChild(button('Start', play));
+}
+function play() {
+    root.innerHTML = '';
+    const header = el('div');
+    header.appendChild(levelHeader(level));
+    header.appendChild(el('span', {class: 'css-dd6wi1 lives'}, 'Lives ' + lives));
+    root.appendChild(header);
+    const size = gridSize(level);
+    grid = el('div', {class: 'css-hvbk5q eut2yre0',
+        style: 'grid-template-columns: repeat(' + size + ', 1fr); grid-template-rows: repeat(' + size + ', 1fr);'});
+    cells = [];
+    for (let i = 0; i < size * size; i++) {
+        const cell = el('div', {class: 'css-lxtdud eut2yre1'});
+        cell.addEventListener('mousedown', () => press(i));
+        cells.push(cell);
+        grid.appendChild(cell);
+    }
+    root.appendChild(grid);
+    const order = cells.map((_, i) => i);
+    for (let i = order.length - 1; i > 0; i--) {
+        const j = Math.floor(random() * (i + 1));
+        [order[i], order[j]] = [order[j], order[i]];
+    }
+    pattern = new Set(order.slice(0, level + 2));
+    mistakes = 0; found = 0; accepting = false;
+    later(() => pattern.forEach((i) => { cells[i].className = 'active css-lxtdud eut2yre1'; }), 500);
+    later(() => {
+        pattern.forEach((i) => { cells[i].className = 'css-lxtdud eut2yre1'; });
+        accepting = true;
+    }, 1500);
+}
+function press(index) {
+    if (!accepting || cells[index].className !== 'css-lxtdud eut2yre1') return;
+    if (pattern.has(index)) {
+        cells[index].className = 'active css-lxtdud eut2yre1';
+        found += 1;
+        if (found < pattern.size) return;
+        accepting = false;
+        level += 1;
+        if (reachedMaxLevel(level)) return later(() => finish(level - 1, level - 1), 300);
+        return later(play, 300);
+    }
+    cells[index].className = 'css-lxtdud eut2yre1 error';
+    mistakes += 1;
+    if (mistakes < 3) return;
+    accepting = false;
+    lives -= 1;
+    if (lives <= 0) return later(() => finish(level - 1, level), 300);
+    later(play, 300);
+}
+intro();
+"""
+
+# Maps the path of every test on the live site to (page title, page script)
+PAGES = {
+    "/tests/reactiontime": ("Reaction Time Test", REACTION_TIME_JS),
+    "/tests/aim": ("Aim Trainer", AIM_JS),
+    "/tests/chimp": ("Chimp Test", CHIMP_JS),
+    "/tests/typing": ("Typing Test", TYPING_JS),
+    "/tests/sequence": ("Sequence Memory Test", SEQUENCE_JS),
+    "/tests/number-memory": ("Number Memory Test", NUMBER_JS),
+    "/tests/verbal-memory": ("Verbal Memory Test", VERBAL_JS),
+    "/tests/memory": ("Visual Memory Test", VISUAL_JS),
+}
+
+# Scripts of the consent banner and the ad, under paths named after the hosts serving them on the live site
+THIRD_PARTY_SCRIPTS = {
+    "/fundingchoicesmessages.google.com/consent.js": CONSENT_JS,
+    "/pagead2.googlesyndication.com/ad.js": AD_JS,
+}
+
+# Replays a recorded DOM session: restores the snapshot, then applies the recorded mutations at their
+# recorded times divided by speed. Every recorded click or key press is a gate, the replay only goes on
+# once the solver pressed the same element, so the site's answers follow the solver's input.
+REPLAY_JS = r"""
+const speed = parseFloat(new URLSearchParams(location.search).get('speed') || '1');
+const gates = fixture.timeline.filter((entry) => entry.kind === 'click' || entry.kind === 'key').length;
+const state = {ready: false, finished: false, applied: 0, gates: 0, total_gates: gates, unexpected: 0};
+window.hbReplay = state;
+
+const nodeAt = (path) => path.reduce((node, index) => node && node.childNodes[index], document.body);
+const pathOf = (node) => {
+    const path = [];
+    while (node && node !== document.body) {
+        if (!node.parentNode) return null;
+        path.unshift(Array.prototype.indexOf.call(node.parentNode.childNodes, node));
+        node = node.parentNode;
+    }
+    return node ? path : null;
+};
+const nested = (a, b) => a.length <= b.length ? a.every((index, i) => b[i] === index)
+                                              : b.every((index, i) => a[i] === index);
+
+// Inputs are queued, the solver may press an element before the replay reached its gate
+const inputs = [];
+let gate = null;
+const release = () => {
+    if (!gate) return;
+    const position = inputs.findIndex((input) => input.kind === gate.entry.kind &&
+                                                 (input.kind === 'key' || nested(input.path, gate.entry.path)));
+    if (position < 0) return;
+    state.unexpected += position;
+    inputs.splice(0, position + 1);
+    state.gates += 1;
+    const resolve = gate.resolve;
+    gate = null;
+    resolve();
+};
+['mousedown', 'keydown'].forEach((type) => document.addEventListener(type, (event) => {
+    inputs.push({kind: type === 'keydown' ? 'key' : 'click', path: pathOf(event.target) || []});
+    release();
+}, true));
+
+const apply = (entry) => {
+    const node = nodeAt(entry.path);
+    if (!node) return;
+    if (entry.kind === 'html') node.innerHTML = entry.html;
+    else if (entry.value === null) node.removeAttribute(entry.name);
+    else node.setAttribute(entry.name, entry.value);
+    state.applied += 1;
+};
+
+(async () => {
+    document.body.innerHTML = fixture.snapshot.html;
+    state.ready = true;
+    let clock = 0;
+    for (const entry of fixture.timeline) {
+        if (entry.t > clock) await new Promise((resolve) => setTimeout(resolve, (entry.t - clock) / speed));
+        clock = Math.max(clock, entry.t);
+        if (entry.kind === 'click' || entry.kind === 'key') {
+            await new Promise((resolve) => {
+                gate = {entry: entry, resolve: resolve};
+                release();
+            });
+        } else {
+            apply(entry);
+        }
+    }
+    state.finished = true;
+})();
+"""
+
+REPLAY_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__ - replay</title>
+<style>__CSS__</style>
+<script>const fixture = __FIXTURE__;</script>
+</head>
+<body>
+<script>__REPLAY_JS__</script>
+</body>
+</html>
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__ - Human Benchmark (offline)</title>
+<style>__CSS__</style>
+</head>
+<body>
+<div id="root"></div>
+<script>__COMMON_JS__</script>
+<script>__TEST_JS__</script>
+<script src="/fundingchoicesmessages.google.com/consent.js"></script>
+<script src="/pagead2.googlesyndication.com/ad.js"></script>
+</body>
+</html>
+"""
+
+def render_page(path: str) -> str:
+    """
+    Builds the HTML of the page served under the given path.
+
+    Args:
+        path (str): The path of the test, e.g. "/tests/aim".
+
+    Returns:
+        str: The HTML of the page or None if there is no page for the path.
+    """
+    if path == "/":
+        links = "".join(f'<li><a href="{page}">{title}</a></li>' for page, (title, _) in PAGES.items())
+        return f"<!DOCTYPE html><html><body><ul>{links}</ul></body></html>"
+
+    if path not in PAGES:
+        return None
+
+    title, script = PAGES[path]
+    return (PAGE_TEMPLATE
+            .replace("__TITLE__", title)
+            .replace("__CSS__", CSS)
+            .replace("__COMMON_JS__", COMMON_JS)
+            .replace("__TEST_JS__", script))
+
+def render_replay(fixtures_dir: str, name: str) -> str:
+    """
+    Builds the HTML of the page replaying a recorded session.
+
+    Args:
+        fixtures_dir (str): The directory holding the fixtures.
+        name (str): The name of the fixture, without .json.
+
+    Returns:
+        str: The HTML of the page or None if there is no such fixture.
+    """
+    path = os.path.join(fixtures_dir, os.path.basename(name) + ".json")
+    if not os.path.isfile(path):
+        return None
+
+    with open(path) as file:
+        fixture = json.load(file)
+    return (REPLAY_TEMPLATE
+            .replace("__TITLE__", fixture.get("test", name))
+            .replace("__CSS__", fixture["snapshot"]["css"])
+            .replace("__FIXTURE__", json.dumps(fixture).replace("</", "<\\/"))
+            .replace("__REPLAY_JS__", REPLAY_JS))
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves the offline test pages, and the replays of the server's fixtures directory if it has one.
+    """
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        fixtures_dir = getattr(self.server, "fixtures_dir", None)
+        if path in THIRD_PARTY_SCRIPTS:
+            content, content_type = THIRD_PARTY_SCRIPTS[path], "application/javascript"
+        elif path.startswith("/replay/") and fixtures_dir:
+            content, content_type = render_replay(fixtures_dir, path[len("/replay/"):]), "text/html"
+        else:
+            content, content_type = render_page(path), "text/html"
+
+        if content is None:
+            self.send_error(404)
+            return
+
+        body = content.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+def start_server(host: str = "127.0.0.1", port: int = 0, fixtures_dir: str = None) -> tuple:
+    """
+    Starts the offline site in a background thread.
+
+    Args:
+        host (str, optional): The interface to listen on. Defaults to "127.0.0.1".
+        port (int, optional): The port to listen on, 0 picks a free one. Defaults to 0.
+        fixtures_dir (str, optional): The directory of the recorded sessions served under /replay/.
+            Defaults to None.
+
+    Returns:
+        tuple: The running server and its base URL, e.g. "http://127.0.0.1:8000".
+    """
+    server = ThreadingHTTPServer((host, port), MockSiteHandler)
+    server.fixtures_dir = fixtures_dir
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the offline Human Benchmark stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fixtures", help="Directory of recorded sessions to serve under /replay/")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MockSiteHandler)
+    server.fixtures_dir = args.fixtures
+    print(f"Serving the offline Human Benchmark on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
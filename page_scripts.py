@@ -0,0 +1,72 @@
+"""
+JavaScript shared by the scripts the engines run in the page.
+
+PAGE_HELPERS_JS declares the helpers every page script can use next to the selectors of the locator
+registry (hbSelectors): synthetic clicks, waits on the DOM, the level of the memory tests, grid indexing
+and the replay of a sequence memory level. The WebDriver engine prepends it to the scripts it runs and
+the DevTools engines to the scripts they evaluate, so the engines share one copy of every helper and one
+replay timing.
+"""
+
+# The sequence memory board ignores clicks for a moment after the last square went dark, so a replay is
+# repeated this often until the level advances, and given up after this long
+REPLAY_RETRY_MS = 40
+REPLAY_TIMEOUT_MS = 2000
+
+PAGE_HELPERS_JS = r"""
+const hbClick = (node) => {
+    const rect = node.getBoundingClientRect();
+    const init = {bubbles: true, cancelable: true, view: window, button: 0,
+                  clientX: rect.left + rect.width / 2, clientY: rect.top + rect.height / 2};
+    node.dispatchEvent(new MouseEvent('mousedown', init));
+    node.dispatchEvent(new MouseEvent('mouseup', init));
+    node.dispatchEvent(new MouseEvent('click', init));
+};
+const hbWaitFor = (find, timeout) => new Promise((resolve, reject) => {
+    const found = find();
+    if (found) return resolve(found);
+    const observer = new MutationObserver(() => {
+        const found = find();
+        if (!found) return;
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve(found);
+    });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        reject(new Error('timed out after ' + timeout + ' ms'));
+    }, timeout);
+});
+// The level shown by the memory tests, null once the result replaced it
+const hbLevel = () => {
+    const levelSpan = document.querySelector(hbSelectors.level);
+    return levelSpan ? parseInt(levelSpan.textContent, 10) : null;
+};
+// The cells of a grid, indexed once and again only if a cell is not in it, i.e. the board was rendered again
+const hbGrid = (selector) => {
+    const grid = {cells: [], indices: new Map()};
+    grid.index = () => {
+        grid.cells = Array.from(document.querySelectorAll(selector));
+        grid.indices = new Map(grid.cells.map((cell, index) => [cell, index]));
+    };
+    grid.indexOf = (cell) => {
+        if (!grid.indices.has(cell)) grid.index();
+        return grid.indices.has(cell) ? grid.indices.get(cell) : -1;
+    };
+    return grid;
+};
+// Replays a sequence memory level with clickAll until the level advances or the board is gone
+const hbReplaySequence = async (clickAll, retryMs, timeoutMs) => {
+    const shownLevel = hbLevel();
+    const advanced = () => hbLevel() !== shownLevel || !document.querySelector(hbSelectors.sequence_square);
+    const deadline = performance.now() + timeoutMs;
+    let replays = 0;
+    while (!advanced() && performance.now() < deadline) {
+        clickAll();
+        replays += 1;
+        await hbWaitFor(advanced, retryMs).catch(() => null);
+    }
+    return {replays: replays, advanced: advanced()};
+};
+"""
@@ -0,0 +1,88 @@
+"""
+Runs independent tests concurrently, each in its own headless browser.
+
+Every test lives on its own URL and shares no state with the others, so the selected tests (or several
+repetitions of one test) can be spread over a thread pool sized to the machine's cores, with one
+browser per worker taken from a DriverPool. As no single test is the current one, the stop key stops
+the whole run while they do.
+"""
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+
+from cancellation import stop_signal
+from driver_pool import DriverPool, run_in_pool
+
+def headless_options(options: webdriver.ChromeOptions) -> webdriver.ChromeOptions:
+    """
+    Copies Chrome options and makes them launch a headless browser.
+
+    Args:
+        options (webdriver.ChromeOptions): The options to copy.
+
+    Returns:
+        webdriver.ChromeOptions: The headless options.
+    """
+    options = copy.deepcopy(options)
+    if "--headless=new" not in options.arguments:
+        options.add_argument("--headless=new")
+    return options
+
+def run_parallel(jobs: list, options: webdriver.ChromeOptions, workers: int = None, warm_up=None) -> list:
+    """
+    Runs tests concurrently in separate headless browsers.
+
+    Args:
+        jobs (list): One (test name, open page, test function) tuple per run. Both functions are called with
+            the driver, the first one navigates to the test and waits until it can start.
+        options (webdriver.ChromeOptions): The options the browsers are launched with.
+        workers (int, optional): Number of browsers running at the same time. Defaults to the number of cores.
+        warm_up (callable, optional): Called once with every new browser, e.g. to consent. Defaults to None.
+
+    Returns:
+        list: One dict per job with the test name, its result or error, wall time, setup time and peak memory.
+    """
+    workers = max(1, min(len(jobs), workers or os.cpu_count() or 1))
+
+    def run_job(job: tuple) -> dict:
+        test_name, open_page, test_function = job
+        report = {"test": test_name, "result": None, "error": None, "setup_time": None, "peak_memory": None}
+        start = time.perf_counter()
+        try:
+            report.update(run_in_pool(pool, open_page, test_function))
+        except Exception as error:
+            report["error"] = f"{type(error).__name__}: {error}"
+        report["wall_time"] = time.perf_counter() - start
+        return report
+
+    # A stop of the current test would stay set for every later job, so the stop key stops them all
+    stop_signal.key_stops_run = True
+    try:
+        with DriverPool(headless_options(options), size=workers, warm_up=warm_up) as pool:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(run_job, jobs))
+    finally:
+        stop_signal.key_stops_run = False
+
+def print_parallel_report(reports: list, wall_time: float) -> None:
+    """
+    Prints the consolidated results of a parallel run.
+
+    Args:
+        reports (list): The reports returned by run_parallel.
+        wall_time (float): The total wall time of the run in seconds.
+
+    Returns:
+        None
+    """
+    print(f"\n{'Test':<18}{'Result':>14}{'Wall time':>12}{'Setup':>10}  Error")
+    for report in reports:
+        print(f"{report['test'].title():<18}{str(report['result']):>14}{report['wall_time']:>11.2f}s"
+              f"{report['setup_time'] or 0:>9.2f}s  {report['error'] or ''}")
+
+    sequential_time = sum(report["wall_time"] for report in reports)
+    print(f"Total wall time: {wall_time:.2f} s for {sequential_time:.2f} s of tests "
+          f"({sequential_time / wall_time:.1f}x)")
@@ -0,0 +1,300 @@
+"""
+Record-and-replay fixtures for offline performance regression tests.
+
+`record` runs the selected tests (against the live site, or the offline stand-in with --offline) with a
+recorder in the page that captures a DOM snapshot of the test and a timeline of every mutation, click and
+key press, and stores each session as <fixtures>/<test>.json.
+
+`run` serves the fixtures with mock_site.py, which replays each timeline in a local page at an accelerated
+speed, gated on the solver pressing the recorded elements, and compares how long every solver takes with
+the baselines stored in <fixtures>/baselines.json. A solver that broke because the site changed stops
+passing the gates and times out; one that got slower exceeds its baseline. Either makes `run` exit with
+status 1, so it can gate a CI job.
+
+Usage:
+    python replay.py record --tests "reaction time" "sequence memory" --max-levels 5
+    python replay.py run --speed 4
+    python replay.py run --update-baselines
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from urllib.parse import urlencode
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+import HumanBenchmark_Bot as bot
+import mock_site
+from parallel_runner import headless_options
+
+# Captures the DOM of the test once and records every later mutation, click and key press
+RECORDER_JS = r"""
+if (window.hbRecording) return;
+const start = performance.now();
+const now = () => performance.now() - start;
+const pathOf = (node) => {
+    const path = [];
+    while (node && node !== document.body) {
+        if (!node.parentNode) return null;
+        path.unshift(Array.prototype.indexOf.call(node.parentNode.childNodes, node));
+        node = node.parentNode;
+    }
+    return node ? path : null;
+};
+const css = Array.from(document.styleSheets, (sheet) => {
+    try {
+        return Array.from(sheet.cssRules, (rule) => rule.cssText).join('\n');
+    } catch (error) {
+        return '';
+    }
+}).join('\n');
+const recording = {url: location.href, snapshot: {html: document.body.innerHTML, css: css}, timeline: []};
+
+new MutationObserver((mutations) => {
+    const t = now();
+    const rewritten = new Set();
+    for (const mutation of mutations) {
+        if (mutation.type === 'attributes') {
+            const path = pathOf(mutation.target);
+            if (path) recording.timeline.push({t: t, kind: 'attr', path: path, name: mutation.attributeName,
+                                               value: mutation.target.getAttribute(mutation.attributeName)});
+            continue;
+        }
+        // Added, removed or edited children are recorded as the new content of their parent
+        const target = mutation.type === 'characterData' ? mutation.target.parentNode : mutation.target;
+        if (!target || rewritten.has(target)) continue;
+        rewritten.add(target);
+        const path = pathOf(target);
+        if (path) recording.timeline.push({t: t, kind: 'html', path: path, html: target.innerHTML});
+    }
+}).observe(document.body, {subtree: true, childList: true, attributes: true, characterData: true});
+
+['mousedown', 'keydown'].forEach((type) => document.addEventListener(type, (event) => {
+    recording.timeline.push({t: now(), kind: type === 'keydown' ? 'key' : 'click', path: pathOf(event.target) || []});
+}, true));
+window.hbRecording = recording;
+"""
+
+def fixture_name(test_name: str) -> str:
+    """
+    Names the fixture of a test.
+
+    Args:
+        test_name (str): The name of the test, as in test_urls.
+
+    Returns:
+        str: The file name without .json, e.g. "reaction-time".
+    """
+    return test_name.replace(" ", "-")
+
+def record_session(driver: webdriver.Chrome, test_name: str, test_function, fixtures_dir: str) -> str:
+    """
+    Opens a test, runs it with the recorder in the page and stores the session.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        test_name (str): The name of the test, as in test_urls.
+        test_function (callable): Called with the driver to run the test.
+        fixtures_dir (str): The directory the fixture is written to.
+
+    Returns:
+        str: The path of the fixture.
+    """
+    bot.open_test(driver, test_name)
+    driver.execute_script(RECORDER_JS)
+
+    start = time.perf_counter()
+    result = test_function(driver)
+    duration = time.perf_counter() - start
+    recording = driver.execute_script("return window.hbRecording;")
+
+    path = os.path.join(fixtures_dir, fixture_name(test_name) + ".json")
+    with open(path, "w") as file:
+        json.dump({"test": test_name, "recorded_at": time.time(), "result": result, "duration": duration,
+                   **recording}, file)
+    print(f"Recorded {len(recording['timeline'])} events of {test_name.title()} in {duration:.2f} s to {path}")
+    return path
+
+def replay_session(driver: webdriver.Chrome, base_url: str, test_name: str, test_function, speed: float) -> dict:
+    """
+    Runs a solver against the replay of its recorded session.
+
+    Args:
+        driver (webdriver.Chrome): The web driver instance for controlling the browser.
+        base_url (str): The base URL of the mock site serving the fixtures.
+        test_name (str): The name of the test, as in test_urls.
+        test_function (callable): Called with the driver to run the test.
+        speed (float): Factor the recorded delays are divided by.
+
+    Returns:
+        dict: The test, its result or error, its duration and the gates it passed.
+    """
+    driver.get(f"{base_url}/replay/{fixture_name(test_name)}?{urlencode({'speed': speed})}")
+    WebDriverWait(driver, 10).until(lambda driver: driver.execute_script("return window.hbReplay.ready;"))
+
+    report = {"test": test_name, "result": None, "error": None}
+    start = time.perf_counter()
+    try:
+        report["result"] = test_function(driver)
+    except Exception as error:
+        report["error"] = f"{type(error).__name__}: {error}"
+    report["duration"] = time.perf_counter() - start
+
+    state = driver.execute_script("return window.hbReplay;")
+    report.update({key: state[key] for key in ["gates", "total_gates", "unexpected", "finished"]})
+    return report
+
+def compare_to_baseline(report: dict, baseline: float, tolerance: float) -> str:
+    """
+    Judges a replay against its baseline.
+
+    Args:
+        report (dict): The report returned by replay_session.
+        baseline (float): The stored duration in seconds, or None.
+        tolerance (float): The fraction the duration may exceed the baseline by.
+
+    Returns:
+        str: "broken" if the solver failed or did not pass every gate, "slower", "ok" or "new".
+    """
+    if report["error"] or report["gates"] < report["total_gates"]:
+        return "broken"
+    if baseline is None:
+        return "new"
+    return "slower" if report["duration"] > baseline * (1 + tolerance) else "ok"
+
+def load_baselines(fixtures_dir: str) -> dict:
+    """
+    Loads the stored baselines.
+
+    Args:
+        fixtures_dir (str): The directory of the fixtures.
+
+    Returns:
+        dict: The durations in seconds per fixture and engine.
+    """
+    path = os.path.join(fixtures_dir, "baselines.json")
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def save_baselines(fixtures_dir: str, baselines: dict) -> None:
+    """
+    Stores the baselines.
+
+    Args:
+        fixtures_dir (str): The directory of the fixtures.
+        baselines (dict): The durations in seconds per fixture and engine.
+
+    Returns:
+        None
+    """
+    with open(os.path.join(fixtures_dir, "baselines.json"), "w") as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+
+def record(args) -> None:
+    """
+    Records a session of each selected test into the fixtures directory.
+
+    Args:
+        args (argparse.Namespace): The arguments of the record command.
+
+    Returns:
+        None
+    """
+    os.makedirs(args.fixtures, exist_ok=True)
+    functions = bot.make_test_functions(args.tries, None, False, args.engine == "fast", args.max_levels)
+
+    server = None
+    if args.offline:
+        server, base_url = mock_site.start_server()
+        bot.override_test_urls(base_url, urlencode({"seed": args.seed, "max_level": args.max_levels}))
+
+    driver = webdriver.Chrome(options=bot.options if args.show_browser else headless_options(bot.options))
+    try:
+        bot.warm_up(driver)
+        for test_name in args.tests or list(functions):
+            record_session(driver, test_name, functions[test_name], args.fixtures)
+    finally:
+        driver.quit()
+        if server:
+            server.shutdown()
+
+def run(args) -> bool:
+    """
+    Replays the recorded sessions, prints how every solver compares with its baseline and optionally
+    stores the new baselines.
+
+    Args:
+        args (argparse.Namespace): The arguments of the run command.
+
+    Returns:
+        bool: True if no solver broke or got slower than its baseline.
+    """
+    functions = bot.make_test_functions(args.tries, None, False, args.engine == "fast", args.max_levels)
+    tests = args.tests or [test_name for test_name in functions
+                           if os.path.isfile(os.path.join(args.fixtures, fixture_name(test_name) + ".json"))]
+    baselines = load_baselines(args.fixtures)
+
+    server, base_url = mock_site.start_server(fixtures_dir=args.fixtures)
+    driver = webdriver.Chrome(options=bot.options if args.show_browser else headless_options(bot.options))
+    reports = []
+    try:
+        for test_name in tests:
+            print(f"Replaying {test_name.title()}")
+            reports.append(replay_session(driver, base_url, test_name, functions[test_name], args.speed))
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    passed = True
+    print(f"\n{'Test':<18}{'Duration':>10}{'Baseline':>10}{'Gates':>12}{'Unexpected':>12}  Status")
+    for report in reports:
+        baseline = baselines.get(fixture_name(report["test"]), {}).get(args.engine)
+        status = compare_to_baseline(report, baseline, args.tolerance)
+        passed = passed and status not in ("broken", "slower")
+        print(f"{report['test'].title():<18}{report['duration']:>9.2f}s"
+              f"{baseline if baseline is not None else float('nan'):>9.2f}s"
+              f"{report['gates']:>6}/{report['total_gates']:<5}{report['unexpected']:>12}  {status} {report['error'] or ''}")
+
+        if args.update_baselines and status != "broken":
+            baselines.setdefault(fixture_name(report["test"]), {})[args.engine] = report["duration"]
+
+    if args.update_baselines:
+        save_baselines(args.fixtures, baselines)
+        print(f"Updated the baselines in {args.fixtures}")
+    return passed
+
+def main():
+    parser = argparse.ArgumentParser(description="Record DOM sessions and replay them offline against the solvers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in [("record", "Record the sessions of the selected tests."),
+                            ("run", "Replay the recorded sessions and compare with the baselines.")]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--tests", nargs="+", choices=list(bot.test_urls), help="Tests (default: all)")
+        command.add_argument("--fixtures", default="fixtures", help="Directory of the fixtures")
+        command.add_argument("--engine", choices=["standard", "fast"], default="standard")
+        command.add_argument("--tries", type=int, default=3)
+        command.add_argument("--max-levels", type=int, default=5, help="Level at which the endless tests stop")
+        command.add_argument("--show-browser", action="store_true", help="Run Chrome with a window")
+
+    commands.choices["record"].add_argument("--offline", action="store_true",
+                                            help="Record the offline stand-in instead of the live site")
+    commands.choices["record"].add_argument("--seed", type=int, default=1, help="Seed of the offline pages")
+    commands.choices["run"].add_argument("--speed", type=float, default=4, help="Replay speed factor")
+    commands.choices["run"].add_argument("--tolerance", type=float, default=0.2,
+                                         help="Fraction a solver may exceed its baseline by")
+    commands.choices["run"].add_argument("--update-baselines", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args)
+    elif not run(args):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Structured storage of test results.
+
+Every run of a test is appended as one record (test, score, level reached, durations, round trips, ...)
+to a JSON Lines file, or to an SQLite database when the path ends in .db or .sqlite, so repeated runs
+can be compared with summarize.
+"""
+import json
+import re
+import sqlite3
+import statistics
+import time
+
+def is_sqlite(path: str) -> bool:
+    """
+    Checks whether a results path is an SQLite database.
+
+    Args:
+        path (str): The results path.
+
+    Returns:
+        bool: True if the path ends in .db, .sqlite or .sqlite3.
+    """
+    return path.endswith((".db", ".sqlite", ".sqlite3"))
+
+def score_value(score) -> float:
+    """
+    Extracts the number of a score as shown by the site, e.g. 250 from "250ms".
+
+    Args:
+        score: The score returned by a test function.
+
+    Returns:
+        float: The number or None if the score has none.
+    """
+    if isinstance(score, (int, float)):
+        return float(score)
+    match = re.search(r"-?\d+(\.\d+)?", str(score or ""))
+    return float(match.group()) if match else None
+
+def append_result(path: str, record: dict) -> None:
+    """
+    Appends one record to the results file.
+
+    Args:
+        path (str): The JSON Lines file or SQLite database.
+        record (dict): The record, its "timestamp" and "value" are filled in when missing.
+
+    Returns:
+        None
+    """
+    record = dict(record)
+    record.setdefault("timestamp", time.time())
+    record.setdefault("value", score_value(record.get("score")))
+
+    if not is_sqlite(path):
+        with open(path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+        return
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE IF NOT EXISTS results "
+                           "(timestamp REAL, test TEXT, value REAL, duration REAL, record TEXT)")
+        connection.execute("INSERT INTO results VALUES (?, ?, ?, ?, ?)",
+                           (record["timestamp"], record.get("test"), record["value"], record.get("duration"),
+                            json.dumps(record)))
+
+def load_results(path: str) -> list:
+    """
+    Loads every record of the results file.
+
+    Args:
+        path (str): The JSON Lines file or SQLite database.
+
+    Returns:
+        list: The records in the order they were stored.
+    """
+    if not is_sqlite(path):
+        with open(path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    with sqlite3.connect(path) as connection:
+        return [json.loads(row[0]) for row in connection.execute("SELECT record FROM results ORDER BY rowid")]
+
+def percentiles(values: list, points: tuple = (50, 90, 99)) -> dict:
+    """
+    Computes percentiles of the values.
+
+    Args:
+        values (list): The values.
+        points (tuple, optional): The percentiles to compute. Defaults to (50, 90, 99).
+
+    Returns:
+        dict: The percentiles by point, or an empty dict if there are no values.
+    """
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {point: values[0] for point in points}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {point: cuts[point - 1] for point in points}
+
+def summarize(records: list) -> dict:
+    """
+    Summarises the records per test.
+
+    Args:
+        records (list): The records returned by load_results.
+
+    Returns:
+        dict: Per test, the number of runs and the percentiles of the score values and durations.
+    """
+    tests = {}
+    for record in records:
+        tests.setdefault(record["test"], []).append(record)
+
+    return {test: {
+        "runs": len(runs),
+        "value": percentiles([run["value"] for run in runs if run.get("value") is not None]),
+        "duration": percentiles([run["duration"] for run in runs if run.get("duration") is not None]),
+    } for test, runs in tests.items()}
+
+def print_summary(summary: dict) -> None:
+    """
+    Prints the summary of every test.
+
+    Args:
+        summary (dict): The summary returned by summarize.
+
+    Returns:
+        None
+    """
+    print(f"{'Test':<18}{'Runs':>6}{'Score p50':>11}{'p90':>9}{'p99':>9}{'Time p50':>11}{'p90':>9}{'p99':>9}")
+    for test, totals in summary.items():
+        value, duration = totals["value"], totals["duration"]
+        print(f"{test.title():<18}{totals['runs']:>6}"
+              + "".join(f"{value.get(point, float('nan')):>{11 if point == 50 else 9}.1f}" for point in (50, 90, 99))
+              + "".join(f"{duration.get(point, float('nan')):>{11 if point == 50 else 9}.2f}" for point in (50, 90, 99)))
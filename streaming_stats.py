@@ -0,0 +1,155 @@
+"""
+Constant-memory statistics of long streams of latencies.
+
+A StreamingStats keeps the count, mean and variance online (Welford's algorithm) and a fixed histogram
+of logarithmically spaced buckets, so percentiles can be read at any time within about 1 % while the
+memory stays the same whether it saw ten samples or millions.
+"""
+import math
+
+class StreamingStats:
+    """
+    Online mean, variance, extremes and percentiles of a stream of positive values.
+
+    Args:
+        low (float, optional): Values below it share the first bucket. Defaults to 0.01.
+        high (float, optional): Values above it share the last bucket. Defaults to 1e6.
+        buckets_per_decade (int, optional): Resolution of the histogram, 100 buckets per power of ten
+            keep percentiles within about 1.2 %. Defaults to 100.
+    """
+    def __init__(self, low: float = 0.01, high: float = 1e6, buckets_per_decade: int = 100):
+        self.low = low
+        self.buckets_per_decade = buckets_per_decade
+        self.buckets = [0] * (math.ceil(math.log10(high / low) * buckets_per_decade) + 1)
+        self.count = 0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value: float) -> None:
+        """
+        Adds one value.
+
+        Args:
+            value (float): The value.
+
+        Returns:
+            None
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.squared_deviations += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.buckets[self.bucket(value)] += 1
+
+    def bucket(self, value: float) -> int:
+        """
+        Finds the histogram bucket of a value.
+
+        Args:
+            value (float): The value.
+
+        Returns:
+            int: The index of its bucket.
+        """
+        if value <= self.low:
+            return 0
+        index = int(math.log10(value / self.low) * self.buckets_per_decade) + 1
+        return min(index, len(self.buckets) - 1)
+
+    def merge(self, other: "StreamingStats") -> None:
+        """
+        Adds the values seen by another StreamingStats with the same buckets.
+
+        Args:
+            other (StreamingStats): The other statistics.
+
+        Returns:
+            None
+        """
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.squared_deviations += other.squared_deviations + delta ** 2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    @property
+    def variance(self) -> float:
+        return self.squared_deviations / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimates a percentile from the histogram.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The geometric middle of the bucket holding it, clamped to the extremes seen, or None
+                if no value was added.
+        """
+        if not self.count:
+            return None
+
+        rank = percent / 100 * (self.count - 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen > rank:
+                break
+
+        if index == 0:
+            return self.minimum
+        estimate = self.low * 10 ** ((index - 0.5) / self.buckets_per_decade)
+        return min(max(estimate, self.minimum), self.maximum)
+
+    def percentiles(self, points: tuple = (50, 90, 99)) -> dict:
+        """
+        Estimates several percentiles.
+
+        Args:
+            points (tuple, optional): The percentiles. Defaults to (50, 90, 99).
+
+        Returns:
+            dict: The estimates by percentile.
+        """
+        return {point: self.percentile(point) for point in points}
+
+    def summary(self) -> dict:
+        """
+        Summarises the stream.
+
+        Returns:
+            dict: The count, mean, standard deviation, extremes, p50, p90 and p99.
+        """
+        return {"count": self.count, "mean": self.mean, "stdev": self.stdev, "min": self.minimum,
+                "max": self.maximum, **{f"p{point}": value for point, value in self.percentiles().items()}}
+
+def print_overhead(site: StreamingStats, bot: StreamingStats, action: str) -> None:
+    """
+    Prints the bot's own latency next to the time reported by the site.
+
+    Args:
+        site (StreamingStats): The times reported by the site in milliseconds.
+        bot (StreamingStats): The time the bot spent on its action in milliseconds.
+        action (str): What the bot's time measures, e.g. "click".
+
+    Returns:
+        None
+    """
+    if not site.count or not bot.count:
+        return
+    print(f"Bot {action} latency: mean {bot.mean:.2f} ms, p50 {bot.percentile(50):.2f} ms, "
+          f"p99 {bot.percentile(99):.2f} ms ({bot.mean / site.mean:.0%} of the {site.mean:.0f} ms reported by the site)")
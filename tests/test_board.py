@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+from board import Board
+
+class FakeCell:
+    def __init__(self, id, render, classes=""):
+        self.id = id
+        self.render = render
+        self.classes = classes
+        self.clicks = 0
+
+    def get_attribute(self, name):
+        return self.classes
+
+    def click(self):
+        if self.render.stale(self):
+            raise StaleElementReferenceException("stale element reference")
+        self.clicks += 1
+
+class FakeDriver:
+    """A grid of cells which can be rendered again, e.g. between two levels."""
+    def __init__(self, size):
+        self.size = size
+        self.renders = 0
+        self.lookups = 0
+        self.render()
+
+    def render(self):
+        self.renders += 1
+        self.cells = [FakeCell(f"{self.renders}-{index}", self) for index in range(self.size)]
+
+    def stale(self, cell):
+        return cell not in self.cells
+
+    def find_elements(self, by, value):
+        self.lookups += 1
+        return list(self.cells)
+
+def test_indexes_the_cells_in_one_lookup():
+    driver = FakeDriver(9)
+    board = Board(driver, ("css selector", "div.square"))
+    assert len(board) == 9
+    assert [board.index_of(cell) for cell in driver.cells] == list(range(9))
+    assert driver.lookups == 1
+
+def test_clicks_through_the_cached_handles():
+    driver = FakeDriver(9)
+    board = Board(driver, ("css selector", "div.square"))
+    board.click(4)
+    board.click(4)
+    assert driver.cells[4].clicks == 2
+    assert driver.lookups == 1
+
+def test_a_board_rendered_again_is_indexed_again():
+    driver = FakeDriver(9)
+    board = Board(driver, ("css selector", "div.square"))
+    driver.render()
+
+    board.click(2)
+    assert driver.cells[2].clicks == 1
+    assert driver.lookups == 2
+    assert board.index_of(driver.cells[5]) == 5
+    assert driver.lookups == 2
+
+def test_index_of_a_cell_not_on_the_board():
+    driver = FakeDriver(4)
+    board = Board(driver, ("css selector", "div.square"))
+    assert board.index_of(FakeCell("elsewhere", driver)) is None
+
+def test_has_class():
+    driver = FakeDriver(2)
+    driver.cells[1].classes = "square active"
+    board = Board(driver, ("css selector", "div.square"))
+    assert board.has_class(1, "active")
+    assert not board.has_class(0, "active")
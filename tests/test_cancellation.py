@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+
+import cancellation
+from cancellation import StopSignal
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = threading.Event()
+
+    def quit(self):
+        self.quit_called.set()
+
+def test_a_stop_of_the_current_test_is_cleared():
+    stop = StopSignal()
+    assert not stop.is_set()
+    stop.request("stop key")
+    assert stop.is_set()
+    assert stop.latency is not None
+    with pytest.raises(cancellation.TestStopped, match="stop key"):
+        stop.raise_if_set()
+
+    stop.clear()
+    assert not stop.is_set()
+    assert stop.reason is None
+
+def test_a_stop_of_the_whole_run_is_kept():
+    stop = StopSignal()
+    stop.request("time limit", whole_run=True)
+    stop.clear()
+    assert stop.is_set()
+    assert stop.reason == "time limit"
+
+def test_later_requests_keep_the_reason_but_can_widen_the_stop():
+    stop = StopSignal()
+    stop.request("stop key")
+    stop.request("interrupt", whole_run=True)
+    assert stop.reason == "stop key"
+    assert stop.whole_run
+    stop.clear()
+    assert stop.is_set()
+
+def test_the_watchdog_quits_a_driver_which_did_not_notice_the_stop():
+    stop = StopSignal()
+    driver = FakeDriver()
+    with stop.watchdog(driver, grace=0.05):
+        stop.request("stop key")
+        assert driver.quit_called.wait(2)
+
+def test_the_watchdog_leaves_a_test_which_was_not_stopped():
+    stop = StopSignal()
+    driver = FakeDriver()
+    with stop.watchdog(driver, grace=0.05):
+        time.sleep(0.2)
+    assert not driver.quit_called.is_set()
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+import HumanBenchmark_Bot as bot
+
+def test_keystroke_schedule_follows_the_target_speed():
+    text = "the quick brown fox jumps over the lazy dog " * 20
+    delays = bot.keystroke_schedule(text, wpm=120, jitter=0.3, seed=1)
+    assert len(delays) == len(text)
+    assert all(delay >= 0 for delay in delays)
+    # 120 words of 5 characters per minute are 0.1 s per keystroke
+    assert sum(delays) / len(delays) == pytest.approx(0.1, rel=0.05)
+
+def test_keystroke_schedule_without_jitter_is_even():
+    assert bot.keystroke_schedule("abcde", wpm=60, jitter=0) == [0.2] * 5
+
+def test_keystroke_schedule_is_repeatable_with_a_seed():
+    assert bot.keystroke_schedule("hello world", 90, 0.3, seed=7) == bot.keystroke_schedule("hello world", 90, 0.3, seed=7)
+    assert bot.keystroke_schedule("hello world", 90, 0.3, seed=7) != bot.keystroke_schedule("hello world", 90, 0.3, seed=8)
+
+def test_override_test_urls_keeps_the_paths(monkeypatch):
+    monkeypatch.setattr(bot, "test_urls", dict(bot.test_urls))
+    bot.override_test_urls("http://127.0.0.1:8000/", "seed=1")
+    assert bot.test_urls["visual memory"] == "http://127.0.0.1:8000/tests/memory?seed=1"
+    assert bot.test_urls["reaction time"] == "http://127.0.0.1:8000/tests/reactiontime?seed=1"
+
+    # Pointing the URLs elsewhere again replaces the previous host and query
+    bot.override_test_urls("http://localhost:9000")
+    assert bot.test_urls["number memory"] == "http://localhost:9000/tests/number-memory"
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.webdriver.remote.command import Command
+
+from instrumentation import Instrumentation
+
+def recorded_run():
+    instrumentation = Instrumentation()
+    with instrumentation.test_section("sequence memory"):
+        instrumentation.record(Command.FIND_ELEMENT, 1.0, 1.1, "css selector=div.square")
+        instrumentation.record(Command.W3C_EXECUTE_SCRIPT_ASYNC, 1.1, 1.6, "const done = arguments[0];")
+        # A command polled by a wait only counts as part of the wait's span
+        instrumentation.waiting += 1
+        instrumentation.record(Command.FIND_ELEMENT, 1.6, 1.7, "css selector=div.square.active")
+        instrumentation.waiting -= 1
+        instrumentation.record("WebDriverWait", 1.6, 1.9, "presence_of_element_located", kind="wait")
+        instrumentation.record(Command.CLICK_ELEMENT, 1.9, 2.0, "element-1")
+    instrumentation.record(Command.GET, 2.0, 2.5, None)
+    return instrumentation
+
+def test_summary_splits_waiting_scripts_and_acting():
+    summary = recorded_run().summary()
+    assert set(summary) == {"sequence memory", "no test"}
+    totals = summary["sequence memory"]
+    assert totals["round_trips"] == 4
+    assert totals["wait"] == pytest.approx(0.3)
+    assert totals["script"] == pytest.approx(0.5)
+    assert totals["act"] == pytest.approx(0.2)
+    assert summary["no test"] == {"round_trips": 1, "wait": 0.0, "script": 0.0, "act": pytest.approx(0.5)}
+
+def test_chrome_trace_has_the_kinds_as_categories(tmp_path):
+    instrumentation = recorded_run()
+    path = str(tmp_path / "trace.json")
+    instrumentation.export_chrome_trace(path)
+
+    with open(path) as file:
+        events = json.load(file)["traceEvents"]
+    assert [(event["name"], event["cat"]) for event in events] == [
+        (Command.FIND_ELEMENT, "act"), (Command.W3C_EXECUTE_SCRIPT_ASYNC, "script"), (Command.FIND_ELEMENT, "wait"),
+        ("WebDriverWait", "wait"), (Command.CLICK_ELEMENT, "act"), ("sequence memory", "test"), (Command.GET, "act")]
+    assert all(event["ph"] == "X" for event in events)
+    assert events[1]["dur"] == pytest.approx(0.5e6)
+    assert events[1]["args"]["test"] == "sequence memory"
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+import locators
+
+class FakeDriver:
+    """Answers the selector check with given match counts, one match for the others."""
+    def __init__(self, counts):
+        self.counts = counts
+
+    def execute_script(self, script, entries):
+        return [[name, *self.counts.get(name, (1 if css else None, 1 if using else None))]
+                for name, css, using, value in entries]
+
+@pytest.fixture(autouse=True)
+def restore_locators(monkeypatch):
+    for locator in locators.registry.values():
+        monkeypatch.setattr(locator, "active", locator.active)
+
+def test_every_matching_locator_is_ok():
+    statuses = locators.check_page(FakeDriver({}), [locators.level, locators.start_button])
+    assert set(statuses.values()) == {"ok"}
+
+def test_a_missing_expected_locator_is_reported(capsys):
+    statuses = locators.check_page(FakeDriver({"start_button": (0, 0)}), [locators.start_button])
+    assert statuses["start_button"] == "missing"
+    assert "Locator start_button: missing" in capsys.readouterr().out
+
+def test_a_locator_not_expected_on_the_page_may_be_missing():
+    statuses = locators.check_page(FakeDriver({"start_button": (0, 0)}), [locators.level])
+    assert statuses["start_button"] == "ok"
+
+def test_switches_to_the_fallback_when_only_it_matches():
+    statuses = locators.check_page(FakeDriver({"level": (0, 1)}), [locators.level])
+    assert statuses["level"] == "fallback"
+    assert locators.level.active == locators.level.fallback
+    # The page scripts keep the CSS selector, only the Python lookups switch
+    assert locators.level.selector == locators.level.css
+
+def test_an_invalid_selector_is_reported():
+    statuses = locators.check_page(FakeDriver({"score": (-1, None)}), [])
+    assert statuses["score"] == "invalid"
+
+def test_page_selectors_cover_every_css_locator():
+    declaration = locators.page_selectors_js()
+    assert declaration.startswith("const hbSelectors = {")
+    assert all(f'"{name}"' in declaration for name, locator in locators.registry.items() if locator.css)
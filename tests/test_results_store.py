@@ -0,0 +1,42 @@
+import pytest
+
+from results_store import append_result, load_results, percentiles, score_value, summarize
+
+@pytest.mark.parametrize("name", ["results.jsonl", "results.db", "results.sqlite"])
+def test_load_returns_appended_records_in_order(tmp_path, name):
+    path = str(tmp_path / name)
+    records = [{"test": "reaction time", "score": "183ms", "duration": 4.5, "error": None},
+               {"test": "chimp test", "score": 12, "duration": 30.0, "error": "TimeoutException: no button"}]
+    for record in records:
+        append_result(path, record)
+
+    loaded = load_results(path)
+    assert [{key: record[key] for key in records[0]} for record in loaded] == records
+    assert [record["value"] for record in loaded] == [183.0, 12.0]
+    assert all("timestamp" in record for record in loaded)
+
+def test_append_keeps_given_value_and_timestamp(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    append_result(path, {"test": "typing", "score": "99wpm", "value": 1.0, "timestamp": 5.0})
+    assert load_results(path)[0]["value"] == 1.0
+    assert load_results(path)[0]["timestamp"] == 5.0
+
+@pytest.mark.parametrize("score, value", [(250, 250.0), ("250ms", 250.0), ("Level 7", 7.0), ("1.5s", 1.5),
+                                          (None, None), ("wpm", None)])
+def test_score_value(score, value):
+    assert score_value(score) == value
+
+def test_percentiles():
+    assert percentiles([]) == {}
+    assert percentiles([3.0]) == {50: 3.0, 90: 3.0, 99: 3.0}
+    assert percentiles(list(range(101)), (50, 90)) == {50: 50, 90: 90}
+
+def test_summarize_groups_by_test_and_skips_missing_values():
+    records = [{"test": "typing", "value": 80.0, "duration": 10.0},
+               {"test": "typing", "value": None, "duration": 12.0},
+               {"test": "chimp test", "value": 20.0, "duration": None}]
+    summary = summarize(records)
+    assert summary["typing"]["runs"] == 2
+    assert summary["typing"]["value"][50] == 80.0
+    assert summary["typing"]["duration"][50] == 11.0
+    assert summary["chimp test"]["duration"] == {}
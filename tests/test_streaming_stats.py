@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from streaming_stats import StreamingStats
+
+def samples(count, seed=1):
+    generator = random.Random(seed)
+    return [generator.lognormvariate(5, 1) for _ in range(count)]
+
+def test_empty_stream():
+    stats = StreamingStats()
+    assert stats.percentile(50) is None
+    assert stats.variance == 0.0
+
+@pytest.mark.parametrize("percent", [0, 1, 50, 90, 99, 100])
+def test_percentile_within_a_bucket_of_the_sorted_samples(percent):
+    values = samples(5000)
+    stats = StreamingStats()
+    for value in values:
+        stats.add(value)
+
+    exact = sorted(values)[int(percent / 100 * (len(values) - 1))]
+    assert stats.percentile(percent) == pytest.approx(exact, rel=0.012)
+
+def test_mean_variance_and_extremes():
+    values = samples(1000)
+    stats = StreamingStats()
+    for value in values:
+        stats.add(value)
+
+    mean = sum(values) / len(values)
+    assert stats.mean == pytest.approx(mean)
+    assert stats.variance == pytest.approx(sum((value - mean) ** 2 for value in values) / (len(values) - 1))
+    assert (stats.minimum, stats.maximum) == (min(values), max(values))
+
+def test_merge_equals_a_single_stream():
+    values = samples(3000)
+    single, parts = StreamingStats(), [StreamingStats() for _ in range(3)]
+    for position, value in enumerate(values):
+        single.add(value)
+        parts[position % 3].add(value)
+
+    merged = StreamingStats()
+    for part in parts + [StreamingStats()]:
+        merged.merge(part)
+
+    assert merged.count == single.count
+    assert merged.buckets == single.buckets
+    assert (merged.minimum, merged.maximum) == (single.minimum, single.maximum)
+    assert merged.mean == pytest.approx(single.mean)
+    assert merged.variance == pytest.approx(single.variance)
+    assert merged.percentiles() == single.percentiles()
+
+def test_values_outside_the_range_share_the_outer_buckets():
+    stats = StreamingStats(low=1, high=100)
+    for value in [0.5, 0.8, 1000.0]:
+        stats.add(value)
+    assert stats.buckets[0] == 2 and stats.buckets[-1] == 1
+    assert stats.percentile(0) == 0.5
+    assert stats.percentile(100) == pytest.approx(100, rel=0.012)
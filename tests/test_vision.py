@@ -0,0 +1,44 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+pytest.importorskip("selenium")
+
+from vision import GO_COLOR, CellMasks, decode_frame, encode_frame, grid_rects, synthetic_frame
+
+@pytest.mark.parametrize("size, lit", [(3, set()), (3, {4}), (3, {0, 2, 6, 8}), (5, {1, 7, 12, 13, 24}),
+                                       (7, set(range(0, 49, 3)))])
+def test_lit_cells_survive_the_jpeg_round_trip(size, lit):
+    rects = grid_rects(size)
+    frame = synthetic_frame(800, 800, rects, lit)
+    pixels = decode_frame(encode_frame(frame))
+    assert pixels.shape == frame.shape
+    assert set(CellMasks(rects).lit(pixels, 1.0).tolist()) == lit
+
+@pytest.mark.parametrize("scale", [0.5, 0.75, 2.0])
+def test_lit_cells_are_found_in_scaled_frames(scale):
+    rects = grid_rects(4)
+    lit = {3, 5, 10}
+    frame = synthetic_frame(round(500 * scale), round(500 * scale), rects, lit, scale=scale)
+    assert set(CellMasks(rects).lit(decode_frame(encode_frame(frame)), scale).tolist()) == lit
+
+def test_the_masks_follow_a_new_frame_size():
+    rects = grid_rects(3)
+    masks = CellMasks(rects)
+    assert masks.lit(synthetic_frame(400, 400, rects, {1}), 1.0).tolist() == [1]
+    assert masks.lit(synthetic_frame(200, 200, rects, {7}, scale=0.5), 0.5).tolist() == [7]
+
+def test_go_colour_is_told_apart_from_white():
+    box = [{"left": 50, "top": 50, "width": 300, "height": 200}]
+    masks = CellMasks(box)
+    waiting = decode_frame(encode_frame(synthetic_frame(400, 300, box, set(), cell_color=(206, 38, 54))))
+    go = decode_frame(encode_frame(synthetic_frame(400, 300, box, {0}, lit_color=GO_COLOR)))
+
+    assert masks.lit(waiting, 1.0, GO_COLOR).tolist() == []
+    assert masks.lit(go, 1.0, GO_COLOR).tolist() == [0]
+    assert masks.lit(go, 1.0).tolist() == []
+
+def test_empty_board():
+    masks = CellMasks([])
+    assert len(masks) == 0
+    assert masks.lit(synthetic_frame(100, 100, [], set()), 1.0).tolist() == []
@@ -0,0 +1,561 @@
+"""
+A vision backend detecting the stimuli of the tests in the frames Chrome paints instead of in the DOM.
+
+It runs on a CDPSession of cdp_engine.py: Chrome streams the tab with Page.startScreencast, every frame
+is decoded into a NumPy array and compared with the expected colours at sample points precomputed once
+per board, so the green reaction box and the lit squares of sequence and visual memory are found with a
+few vectorised operations per frame instead of by querying the page. The DOM is only read once per
+level, for the positions of the cells and the level number, and a sequence memory replay is clicked at
+those positions in the page, so it cannot be cut in half.
+
+Requires the optional websockets, numpy and Pillow packages (pip install websockets numpy pillow).
+"""
+import asyncio
+import base64
+import io
+import json
+import time
+
+import locators
+from cdp_engine import WAIT_FOR_CENTER_JS, CDPError, CDPSession, replay_sequence, with_selectors
+from streaming_stats import StreamingStats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Colours of the stimuli, the green reaction box and the white lit squares and cells
+GO_COLOR = (75, 219, 106)
+LIT_COLOR = (255, 255, 255)
+
+# Largest difference per channel from the colour, JPEG artefacts included
+TOLERANCE = 40
+
+# Fraction of the sample points of a cell that must have the colour, text in the cell is not
+COVERAGE = 0.5
+
+# Positions of the cells matching a selector and the current level, in CSS pixels of the viewport
+BOARD_JS = r"""
+((hbSelectors) => {
+    const rect = (node) => {
+        const box = node.getBoundingClientRect();
+        return {left: box.left, top: box.top, width: box.width, height: box.height};
+    };
+    return {level: hbLevel(), cells: Array.from(document.querySelectorAll(%s), rect)};
+})
+"""
+
+# Resolves with the text of the first element matching the selector once it has one
+WAIT_FOR_TEXT_JS = r"""
+new Promise((resolve, reject) => {
+    const find = () => {
+        const node = document.querySelector(%s);
+        if (!node || !node.textContent) return false;
+        resolve(node.textContent);
+        return true;
+    };
+    if (find()) return;
+    const observer = new MutationObserver(() => {
+        if (!find()) return;
+        observer.disconnect();
+        clearTimeout(timer);
+    });
+    observer.observe(document, {subtree: true, childList: true, characterData: true});
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        reject(new Error('timed out after %d ms'));
+    }, %d);
+})
+"""
+
+def require_packages() -> None:
+    """
+    Raises ImportError if numpy or Pillow is missing.
+
+    Returns:
+        None
+    """
+    if np is None or Image is None:
+        raise ImportError("The vision backend requires the numpy and Pillow packages: pip install numpy pillow")
+
+def decode_frame(data: str) -> "np.ndarray":
+    """
+    Decodes a screencast frame.
+
+    Args:
+        data (str): The base64 encoded JPEG or PNG image.
+
+    Returns:
+        np.ndarray: The pixels, of shape (height, width, 3).
+    """
+    return np.asarray(Image.open(io.BytesIO(base64.b64decode(data))).convert("RGB"))
+
+def encode_frame(pixels: "np.ndarray", quality: int = 80) -> str:
+    """
+    Encodes pixels like a screencast frame.
+
+    Args:
+        pixels (np.ndarray): The pixels, of shape (height, width, 3).
+        quality (int, optional): The JPEG quality. Defaults to 80.
+
+    Returns:
+        str: The base64 encoded JPEG image.
+    """
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+def grid_rects(size: int, cell: float = 80, gap: float = 10, left: float = 100, top: float = 100) -> list:
+    """
+    Lays out a square grid like the boards of the memory tests.
+
+    Args:
+        size (int): Cells per side.
+        cell (float, optional): Side of a cell in CSS pixels. Defaults to 80.
+        gap (float, optional): Space between the cells in CSS pixels. Defaults to 10.
+        left (float, optional): Left edge of the grid in CSS pixels. Defaults to 100.
+        top (float, optional): Top edge of the grid in CSS pixels. Defaults to 100.
+
+    Returns:
+        list: The {left, top, width, height} of every cell, row by row.
+    """
+    return [{"left": left + column * (cell + gap), "top": top + row * (cell + gap), "width": cell, "height": cell}
+            for row in range(size) for column in range(size)]
+
+def synthetic_frame(width: int, height: int, rects: list, lit: set, scale: float = 1.0,
+                    background: tuple = (43, 135, 209), cell_color: tuple = (37, 115, 178),
+                    lit_color: tuple = LIT_COLOR) -> "np.ndarray":
+    """
+    Paints a board with some of its cells lit, to test and benchmark the detection without a browser.
+
+    Args:
+        width (int): Width of the frame in pixels.
+        height (int): Height of the frame in pixels.
+        rects (list): The {left, top, width, height} of every cell in CSS pixels.
+        lit (set): Indices of the lit cells.
+        scale (float, optional): Frame pixels per CSS pixel. Defaults to 1.
+        background (tuple, optional): Colour of the page. Defaults to the site's blue.
+        cell_color (tuple, optional): Colour of the cells that are not lit. Defaults to a darker blue.
+        lit_color (tuple, optional): Colour of the lit cells. Defaults to white.
+
+    Returns:
+        np.ndarray: The pixels, of shape (height, width, 3).
+    """
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[:] = background
+    for index, rect in enumerate(rects):
+        x0, y0 = round(rect["left"] * scale), round(rect["top"] * scale)
+        x1, y1 = round((rect["left"] + rect["width"]) * scale), round((rect["top"] + rect["height"]) * scale)
+        pixels[y0:y1, x0:x1] = lit_color if index in lit else cell_color
+    return pixels
+
+class CellMasks:
+    """
+    A grid of sample points inside every cell of a board. The pixel indices are computed once per board
+    and frame size, so every frame is analysed with one fancy-indexing lookup and a colour comparison.
+
+    Args:
+        rects (list): The {left, top, width, height} of every cell in CSS pixels.
+        samples (int, optional): Sample points per side of a cell. Defaults to 6.
+        inset (float, optional): Margin of every side of a cell left out, as a fraction of the cell, so
+            borders, rounded corners and antialiasing are not sampled. Defaults to 0.2.
+    """
+    def __init__(self, rects: list, samples: int = 6, inset: float = 0.2):
+        self.rects = np.array([[rect["left"], rect["top"], rect["width"], rect["height"]] for rect in rects],
+                              dtype=float).reshape(-1, 4)
+        self.fractions = np.linspace(inset, 1 - inset, samples)
+        self.centres = [(float(left + width / 2), float(top + height / 2)) for left, top, width, height in self.rects]
+        self.layout = None
+        self.ys = None
+        self.xs = None
+
+    def __len__(self):
+        return len(self.rects)
+
+    def index(self, shape: tuple, scale: float) -> None:
+        """
+        Computes the pixel indices of the sample points for a frame size, once per size.
+
+        Args:
+            shape (tuple): The (height, width) of the frames.
+            scale (float): Frame pixels per CSS pixel.
+
+        Returns:
+            None
+        """
+        if self.layout == (shape, scale):
+            return
+        self.layout = (shape, scale)
+        left, top, width, height = self.rects.T
+        xs = (left[:, None] + width[:, None] * self.fractions) * scale
+        ys = (top[:, None] + height[:, None] * self.fractions) * scale
+        # Shaped (cells, samples, 1) and (cells, 1, samples) to broadcast to every point of the grid
+        self.ys = np.clip(np.rint(ys), 0, shape[0] - 1).astype(np.intp)[:, :, None]
+        self.xs = np.clip(np.rint(xs), 0, shape[1] - 1).astype(np.intp)[:, None, :]
+
+    def coverage(self, pixels: "np.ndarray", scale: float, color: tuple, tolerance: int = TOLERANCE) -> "np.ndarray":
+        """
+        Measures how much of every cell has a colour.
+
+        Args:
+            pixels (np.ndarray): The frame, of shape (height, width, 3).
+            scale (float): Frame pixels per CSS pixel.
+            color (tuple): The (red, green, blue) colour.
+            tolerance (int, optional): Largest difference per channel. Defaults to TOLERANCE.
+
+        Returns:
+            np.ndarray: The fraction of the sample points of every cell that have the colour.
+        """
+        self.index(pixels.shape[:2], scale)
+        patches = pixels[self.ys, self.xs].astype(np.int16)
+        matches = (np.abs(patches - np.array(color, dtype=np.int16)) <= tolerance).all(axis=-1)
+        return matches.mean(axis=(1, 2))
+
+    def lit(self, pixels: "np.ndarray", scale: float, color: tuple = LIT_COLOR, coverage: float = COVERAGE) -> "np.ndarray":
+        """
+        Finds the cells that have a colour.
+
+        Args:
+            pixels (np.ndarray): The frame, of shape (height, width, 3).
+            scale (float): Frame pixels per CSS pixel.
+            color (tuple, optional): The (red, green, blue) colour. Defaults to LIT_COLOR.
+            coverage (float, optional): Fraction of a cell that must have it. Defaults to COVERAGE.
+
+        Returns:
+            np.ndarray: The indices of the cells.
+        """
+        return np.flatnonzero(self.coverage(pixels, scale, color) >= coverage)
+
+class Screencast:
+    """
+    The frames Chrome paints for a tab, analysed as they arrive.
+
+    Args:
+        session (CDPSession): The session connected to the tab.
+        max_width (int, optional): Width Chrome scales the frames down to. Defaults to 640.
+        quality (int, optional): JPEG quality of the frames. Defaults to 80.
+    """
+    def __init__(self, session: CDPSession, max_width: int = 640, quality: int = 80):
+        require_packages()
+        self.session = session
+        self.max_width = max_width
+        self.quality = quality
+        self.frames = session.subscribe("Page.screencastFrame")
+        self.acks = set()
+        self.timestamp = None
+        self.analysed = 0
+        self.skipped = 0
+        # CPU time spent decoding and analysing a frame, and the age of the frame a stimulus was seen in
+        self.cpu = StreamingStats()
+        self.age = StreamingStats()
+
+    async def start(self) -> None:
+        """
+        Starts the screencast.
+
+        Returns:
+            None
+        """
+        await self.session.send("Page.enable")
+        await self.session.send("Page.startScreencast", {"format": "jpeg", "quality": self.quality,
+                                                         "maxWidth": self.max_width, "maxHeight": self.max_width * 4})
+
+    async def stop(self) -> None:
+        """
+        Stops the screencast, unless the browser is already gone.
+
+        Returns:
+            None
+        """
+        try:
+            await self.session.send("Page.stopScreencast")
+        except (ConnectionError, CDPError):
+            pass
+
+    def acknowledge(self, frame: dict) -> None:
+        """
+        Lets Chrome send the next frame, without waiting for its answer.
+
+        Args:
+            frame (dict): The parameters of the Page.screencastFrame event.
+
+        Returns:
+            None
+        """
+        task = asyncio.ensure_future(self.session.send("Page.screencastFrameAck", {"sessionId": frame["sessionId"]}))
+        self.acks.add(task)
+        task.add_done_callback(self.acks.discard)
+
+    def discard(self) -> None:
+        """
+        Skips the frames received so far.
+
+        Returns:
+            None
+        """
+        while not self.frames.empty():
+            self.acknowledge(self.frames.get_nowait())
+            self.skipped += 1
+
+    async def watch(self, detect, timeout: float):
+        """
+        Analyses the newest frame until a detector finds what it looks for. Frames that arrived while
+        the previous one was analysed are skipped.
+
+        Args:
+            detect (callable): Called with the pixels and the frame pixels per CSS pixel, returns None
+                to keep watching.
+            timeout (float): Seconds to wait.
+
+        Returns:
+            The first value the detector returned other than None.
+
+        Raises:
+            asyncio.TimeoutError: If the detector found nothing in time.
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            frame = await asyncio.wait_for(self.frames.get(), max(0, deadline - time.perf_counter()))
+            while not self.frames.empty():
+                self.acknowledge(frame)
+                frame = self.frames.get_nowait()
+                self.skipped += 1
+            self.acknowledge(frame)
+
+            cpu_start = time.process_time()
+            pixels = decode_frame(frame["data"])
+            result = detect(pixels, pixels.shape[1] / frame["metadata"]["deviceWidth"])
+            self.cpu.add((time.process_time() - cpu_start) * 1000)
+            self.analysed += 1
+
+            if result is not None:
+                self.timestamp = frame["metadata"].get("timestamp")
+                if self.timestamp:
+                    self.age.add(max(time.time() - self.timestamp, 0) * 1000)
+                return result
+
+    def print_stats(self) -> None:
+        """
+        Prints the CPU time per frame and how old the frames were when a stimulus was seen.
+
+        Returns:
+            None
+        """
+        if not self.analysed:
+            return
+        print(f"Analysed {self.analysed} frames ({self.skipped} skipped): CPU p50 {self.cpu.percentile(50):.2f} ms, "
+              f"p99 {self.cpu.percentile(99):.2f} ms per frame")
+        if self.age.count:
+            print(f"Stimuli seen p50 {self.age.percentile(50):.1f} ms, p99 {self.age.percentile(99):.1f} ms "
+                  f"after the frame was captured")
+
+async def board(session: CDPSession, selector: str) -> dict:
+    """
+    Reads the positions of the cells of a board and the current level.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        selector (str): The CSS selector matching every cell.
+
+    Returns:
+        dict: The level, or None if there is none, and the CellMasks of the board under "masks".
+    """
+    layout = await session.evaluate(with_selectors(BOARD_JS % json.dumps(selector)))
+    return {"level": layout["level"], "masks": CellMasks(layout["cells"])}
+
+async def wait_until_dark(screencast: Screencast, masks: CellMasks, timeout: float) -> None:
+    """
+    Waits for a frame in which no cell of a board is lit.
+
+    Args:
+        screencast (Screencast): The running screencast.
+        masks (CellMasks): The board.
+        timeout (float): Seconds to wait.
+
+    Returns:
+        None
+    """
+    await screencast.watch(lambda pixels, scale: True if not len(masks.lit(pixels, scale)) else None, timeout)
+
+async def reaction_time(session: CDPSession, tries: int = 1, timeout: float = 20) -> tuple:
+    """
+    Runs the Reaction Time test, watching the screencast for the box turning green and clicking it with a
+    trusted mouse event.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        tries (int, optional): Number of reaction time attempts. Defaults to 1.
+        timeout (float, optional): Seconds to wait for the box and the result. Defaults to 20.
+
+    Returns:
+        tuple: The StreamingStats of the reaction times and of the delays between the capture of the
+            green frame and the click, in milliseconds.
+    """
+    screencast = Screencast(session)
+    await screencast.start()
+    box_selector = f"{locators.reaction_start.selector}, {locators.reaction_result.selector}"
+    times = StreamingStats()
+    delays = StreamingStats()
+    wait_ms = int(timeout * 1000)
+
+    try:
+        for attempt in range(tries):
+            # The box keeps its place while it changes colour, but not its class, so it is read before the click
+            centre = await session.evaluate(WAIT_FOR_CENTER_JS % (json.dumps(box_selector), wait_ms, wait_ms),
+                                            await_promise=True)
+            box = (await board(session, box_selector))["masks"]
+            await session.click(centre["x"], centre["y"])
+            screencast.discard()
+
+            await screencast.watch(lambda pixels, scale: True if len(box.lit(pixels, scale, GO_COLOR)) else None,
+                                   timeout)
+            await session.click(*box.centres[0])
+            if screencast.timestamp:
+                delays.add((time.time() - screencast.timestamp) * 1000)
+
+            text = await session.evaluate(WAIT_FOR_TEXT_JS % (json.dumps(locators.reaction_time.selector),
+                                                              wait_ms, wait_ms), await_promise=True)
+            times.add(float(text.strip('ms')))
+            print(f"Reaction time for attempt {attempt + 1}: {text}")
+    finally:
+        await screencast.stop()
+
+    screencast.print_stats()
+    return times, delays
+
+async def sequence(session: CDPSession, stop, timeout: float = 5) -> int:
+    """
+    Runs the sequence memory test, watching the screencast for the squares lighting up and replaying
+    them once as many as the level went dark again. As the board only accepts clicks a moment after the
+    last square went dark, the replay is repeated in the page until the level advances, see
+    cdp_engine.replay_sequence.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        stop (callable): Called with the current level, the test stops when it returns True.
+        timeout (float, optional): Seconds to wait for a square, plus one per level. Defaults to 5.
+
+    Returns:
+        int: The last level that was reached.
+    """
+    screencast = Screencast(session)
+    await screencast.start()
+    await session.click_selector(locators.start_button.selector)
+    # The grid is fixed, its positions are read once
+    masks = (await board(session, locators.sequence_square.selector))["masks"]
+
+    level_number = 0
+    start = time.perf_counter()
+
+    try:
+        while not stop(level_number):
+            level_start = time.perf_counter()
+            flashes = []
+            lit_before = set()
+            level = None
+            try:
+                # The sequence is complete once as many squares as the level lit up and all are dark again
+                while level is None or len(flashes) < level or lit_before:
+                    lit = await screencast.watch(lambda pixels, scale: set(masks.lit(pixels, scale).tolist()),
+                                                 timeout + level_number)
+                    flashes.extend(sorted(lit - lit_before))
+                    lit_before = lit
+                    if flashes and level is None:
+                        level = (await board(session, locators.sequence_square.selector))["level"] or 1
+
+                level_number = level
+            except asyncio.TimeoutError:
+                print("Sequence Memory test completed or failed.")
+                break
+
+            replay = await replay_sequence(session, [masks.centres[index] for index in flashes[:level_number]])
+            if not replay["advanced"]:
+                print("The board did not accept the sequence.")
+                break
+
+            try:
+                # Squares flashing because they were clicked are not part of the next sequence
+                screencast.discard()
+                await wait_until_dark(screencast, masks, timeout)
+            except asyncio.TimeoutError:
+                print("Sequence Memory test completed or failed.")
+                break
+
+            print(f"Level {level_number}: replayed {flashes[:level_number]} {replay['replays']} time(s) "
+                  f"after {(time.perf_counter() - level_start) * 1000:.0f} ms")
+
+        else:
+            print("Stopping test...")
+    finally:
+        await screencast.stop()
+
+    elapsed = time.perf_counter() - start
+    if level_number:
+        print(f"Reached level {level_number} at {level_number / elapsed:.2f} levels per second")
+    screencast.print_stats()
+    return level_number
+
+async def visual(session: CDPSession, stop, timeout: float = 10) -> int:
+    """
+    Runs the visual memory test, watching the screencast for the cells shown in each level and clicking
+    them once they are hidden again. The board is read again for every level, as it grows.
+
+    Args:
+        session (CDPSession): The session connected to the test's tab.
+        stop (callable): Called with the current level, the test stops when it returns True.
+        timeout (float, optional): Seconds to wait for the cells of a level. Defaults to 10.
+
+    Returns:
+        int: The last level that was reached.
+    """
+    screencast = Screencast(session)
+    await screencast.start()
+    await session.click_selector(locators.start_button.selector)
+
+    level_number = 0
+    masks = None
+    start = time.perf_counter()
+
+    try:
+        while not stop(level_number):
+            try:
+                # The clicked cells stay lit until the board of the next level replaces them
+                if masks is not None:
+                    screencast.discard()
+                    await wait_until_dark(screencast, masks, timeout)
+
+                layout = await board(session, locators.visual_cell.selector)
+                masks = layout["masks"]
+
+                revealed = set()
+                while True:
+                    lit = await screencast.watch(lambda pixels, scale: set(masks.lit(pixels, scale).tolist()), timeout)
+                    if lit:
+                        revealed |= lit
+                    elif revealed:
+                        break
+            except asyncio.TimeoutError:
+                print("Game stopped")
+                break
+
+            for index in sorted(revealed):
+                await session.click(*masks.centres[index])
+            level_number = layout["level"] or level_number + 1
+            print(f"Current level: {level_number}, clicked cells {sorted(revealed)}")
+
+        else:
+            print("Stopping test...")
+    finally:
+        await screencast.stop()
+
+    elapsed = time.perf_counter() - start
+    if level_number:
+        print(f"Reached level {level_number} at {level_number / elapsed:.2f} levels per second")
+    screencast.print_stats()
+    return level_number